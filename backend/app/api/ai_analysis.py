@@ -1,71 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
-from app.models.ai_analysis import AIAnalysis, StyleCategory
+from app.api.limits import inference_slot, rate_limit
+from app.core.database import get_db, get_read_db
+from app.core.http_cache import conditional_response, latest, make_etag
+from app.core.rate_limit import InferenceOverloadedError, retry_after_header
+from app.models.ai_analysis import AIAnalysis, AnalysisDailySummary, StyleCategory
 from app.schemas.ai_analysis import (
-    AIAnalysisResponse, AIAnalysisCreate, StyleCategoryCreate, 
+    AIAnalysisResponse, AIAnalysisHistory, AIAnalysisCreate, StyleCategoryCreate,
+    AnalysisDailySummary as AnalysisDailySummarySchema,
     StyleCategory as StyleCategorySchema, ImageAnalysisResponse
 )
 from app.services.ai_service import AIService
+from app.services.analysis_runner import MODEL_VERSION, analysis_runner
+from app.services.latest_analysis import get_latest, history_page
 import json
 
 router = APIRouter()
 
-@router.post("/analyze-property", response_model=AIAnalysisResponse)
-async def analyze_property(
-    analysis_request: AIAnalysisCreate,
-    db: Session = Depends(get_db)
-):
+@router.post(
+    "/analyze-property",
+    response_model=AIAnalysisResponse,
+    dependencies=[Depends(rate_limit("analyze_property"))]
+)
+async def analyze_property(analysis_request: AIAnalysisCreate):
     """Analyze a property for price prediction and style detection"""
     
-    # Initialize AI service
-    ai_service = AIService()
-    
     try:
-        # Perform analysis based on type
-        if analysis_request.analysis_type in ["price", "combined"]:
-            price_analysis = await ai_service.predict_price(analysis_request.property_id, db)
-        else:
-            price_analysis = None
-            
-        if analysis_request.analysis_type in ["style", "combined"]:
-            style_analysis = await ai_service.analyze_style(analysis_request.property_id, db)
-        else:
-            style_analysis = None
-        
-        # Create analysis record
-        analysis_data = {
-            "property_id": analysis_request.property_id,
-            "analysis_type": analysis_request.analysis_type,
-            "model_version": "1.0.0"
-        }
-        
-        if price_analysis:
-            analysis_data.update({
-                "predicted_price": price_analysis["predicted_price"],
-                "price_confidence": price_analysis["confidence"],
-                "price_factors": price_analysis["factors"]
-            })
-        
-        if style_analysis:
-            analysis_data.update({
-                "detected_styles": style_analysis["detected_styles"],
-                "style_confidence": style_analysis["confidence"],
-                "style_features": style_analysis["features"]
-            })
-        
-        db_analysis = AIAnalysis(**analysis_data)
-        db.add(db_analysis)
-        db.commit()
-        db.refresh(db_analysis)
-        
-        return db_analysis
-        
+        # Recent or in-flight identical analyses are shared; only a new computation takes an inference slot
+        return await analysis_runner.analyze(analysis_request.property_id, analysis_request.analysis_type)
+    except InferenceOverloadedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis capacity exhausted, please retry shortly",
+            headers=retry_after_header(e.retry_after),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-@router.post("/analyze-image", response_model=ImageAnalysisResponse)
+@router.post(
+    "/analyze-image",
+    response_model=ImageAnalysisResponse,
+    dependencies=[Depends(rate_limit("analyze_image")), Depends(inference_slot)]
+)
 async def analyze_image(
     file: UploadFile = File(...),
     property_id: Optional[int] = Form(None),
@@ -97,7 +76,7 @@ async def analyze_image(
                 "image_analysis": analysis_result["image_analysis"],
                 "quality_score": analysis_result["quality_score"],
                 "processing_time": analysis_result["processing_time"],
-                "model_version": "1.0.0"
+                "model_version": MODEL_VERSION
             }
             
             db_analysis = AIAnalysis(**analysis_data)
@@ -121,7 +100,7 @@ async def analyze_image(
         raise HTTPException(status_code=500, detail=f"Image analysis failed: {str(e)}")
 
 @router.get("/styles/", response_model=List[StyleCategorySchema])
-async def get_style_categories(db: Session = Depends(get_db)):
+async def get_style_categories(db: Session = Depends(get_read_db)):
     """Get all available style categories"""
     styles = db.query(StyleCategory).filter(StyleCategory.is_active == True).all()
     return styles
@@ -138,28 +117,64 @@ async def create_style_category(
     db.refresh(db_style)
     return db_style
 
-@router.get("/property/{property_id}/analysis", response_model=List[AIAnalysisResponse])
+@router.get("/property/{property_id}/analysis", response_model=AIAnalysisHistory)
 async def get_property_analysis(
     property_id: int,
+    request: Request,
     analysis_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all AI analyses for a property"""
+    """Get a property's AI analyses, newest first, one page at a time"""
     query = db.query(AIAnalysis).filter(AIAnalysis.property_id == property_id)
     
     if analysis_type:
         query = query.filter(AIAnalysis.analysis_type == analysis_type)
     
-    analyses = query.order_by(AIAnalysis.created_at.desc()).all()
-    return analyses
+    count, newest_created, newest_updated = query.with_entities(
+        func.count(AIAnalysis.id), func.max(AIAnalysis.created_at), func.max(AIAnalysis.updated_at)
+    ).one()
+    last_modified = latest(newest_created, newest_updated)
+    
+    def render():
+        analyses, next_cursor = history_page(query, cursor, limit)
+        return ORJSONResponse({
+            "analyses": [
+                AIAnalysisResponse.model_validate(analysis).model_dump(mode="json") for analysis in analyses
+            ],
+            "next_cursor": next_cursor,
+            "limit": limit
+        })
+    
+    etag = make_etag("analysis", property_id, analysis_type, cursor, limit, count, last_modified)
+    return conditional_response(request, etag, last_modified, render)
+
+@router.get("/property/{property_id}/analysis/latest", response_model=List[AIAnalysisResponse])
+async def get_latest_property_analysis(property_id: int, db: Session = Depends(get_read_db)):
+    """Get the newest AI analysis of each type for a property"""
+    return get_latest(db, property_id)
+
+@router.get("/property/{property_id}/analysis/daily", response_model=List[AnalysisDailySummarySchema])
+async def get_property_analysis_summaries(
+    property_id: int,
+    analysis_type: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get daily summaries of a property's compacted AI analyses, newest day first"""
+    query = db.query(AnalysisDailySummary).filter(AnalysisDailySummary.property_id == property_id)
+    if analysis_type:
+        query = query.filter(AnalysisDailySummary.analysis_type == analysis_type)
+    return query.order_by(AnalysisDailySummary.day.desc(), AnalysisDailySummary.analysis_type).all()
 
 @router.get("/price-prediction/{property_id}")
-async def get_price_prediction(property_id: int, db: Session = Depends(get_db)):
+async def get_price_prediction(property_id: int, db: Session = Depends(get_read_db)):
     """Get price prediction for a property"""
-    analysis = db.query(AIAnalysis).filter(
-        AIAnalysis.property_id == property_id,
-        AIAnalysis.predicted_price.isnot(None)
-    ).order_by(AIAnalysis.created_at.desc()).first()
+    analysis = next(
+        (analysis for analysis in get_latest(db, property_id, ["price", "combined"])
+         if analysis.predicted_price is not None),
+        None
+    )
     
     if not analysis:
         raise HTTPException(status_code=404, detail="No price prediction found")
@@ -4,23 +4,29 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.security import password_hasher, HashingOverloadedError
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
+from app.services.user_profile import invalidate_user_profile
 
 router = APIRouter()
 
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token", auto_error=False)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# Authenticated user principals keyed by token subject (username)
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def _hashing_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -32,7 +38,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,10 +52,29 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = user_cache.get(username)
+    if principal is None:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            raise credentials_exception
+        principal = UserResponse.model_validate(user)
+        user_cache.set(username, principal)
+    
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Optional[UserResponse]:
+    """Current user for endpoints that also serve anonymous requests"""
+    if not token:
+        return None
+    try:
+        return await get_current_user(token, db)
+    except HTTPException:
+        return None
 
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
@@ -67,7 +92,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except HashingOverloadedError:
+        raise _hashing_unavailable()
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -87,7 +115,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     
     user = db.query(User).filter(User.username == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await password_hasher.verify_and_update(
+                form_data.password, user.hashed_password
+            )
+        except HashingOverloadedError:
+            raise _hashing_unavailable()
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -99,6 +136,10 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     
+    # Transparently upgrade hashes created with outdated cost settings
+    if new_hash:
+        user.hashed_password = new_hash
+    
     # Update last login
     user.last_login = datetime.utcnow()
     db.commit()
@@ -110,20 +151,38 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     }
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: UserResponse = Depends(get_current_user)):
     """Get current user information"""
     return current_user
 
 @router.put("/me", response_model=UserResponse)
 async def update_user_profile(
     preferences: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update user preferences"""
     
-    current_user.preferences = preferences
+    user = db.query(User).filter(User.id == current_user.id).first()
+    user.preferences = preferences
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
+    user_cache.invalidate(user.username)
+    invalidate_user_profile(user.id)
     
-    return current_user
+    return user
+
+@router.delete("/me")
+async def deactivate_account(
+    current_user: UserResponse = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Deactivate the current user's account"""
+    
+    user = db.query(User).filter(User.id == current_user.id).first()
+    user.is_active = False
+    db.commit()
+    user_cache.invalidate(user.username)
+    invalidate_user_profile(user.id)
+    
+    return {"message": "Account deactivated successfully"}
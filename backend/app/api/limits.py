@@ -0,0 +1,42 @@
+from fastapi import Depends, HTTPException, Request, status
+from typing import Optional
+from app.api.auth import get_optional_user
+from app.core.rate_limit import (
+    InferenceOverloadedError, RateLimitExceeded, inference_limiter, rate_limiter, retry_after_header
+)
+from app.schemas.user import UserResponse
+
+def rate_limit(route: str):
+    """Dependency enforcing the ``RATE_LIMITS[route]`` token bucket per user
+    (or per client address for anonymous requests)"""
+
+    async def check_rate_limit(
+        request: Request,
+        current_user: Optional[UserResponse] = Depends(get_optional_user)
+    ):
+        if current_user is not None:
+            key = f"user:{current_user.id}"
+        else:
+            key = f"ip:{request.client.host if request.client else 'unknown'}"
+        try:
+            rate_limiter.check(route, key)
+        except RateLimitExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded, please retry later",
+                headers=retry_after_header(e.retry_after),
+            )
+
+    return check_rate_limit
+
+async def inference_slot():
+    """Dependency holding one of the global inference slots for the request"""
+    try:
+        async with inference_limiter.slot():
+            yield
+    except InferenceOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis capacity exhausted, please retry shortly",
+            headers=retry_after_header(e.retry_after),
+        )
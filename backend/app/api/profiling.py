@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import Optional
+from app.core.profiling import list_profiles, profile_path, token_valid
+
+router = APIRouter()
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    if not token_valid(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+@router.get("/", dependencies=[Depends(require_profiling_token)])
+async def get_profiles():
+    """List stored request profiles, newest first"""
+    return list_profiles()
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def download_profile(profile_id: str):
+    """Download a stored request profile"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if profile_id.endswith(".folded") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=profile_id)
@@ -1,13 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.http_cache import conditional_response, latest, make_etag
+from app.api.auth import get_optional_user
 from app.models.property import Property as PropertyModel
-from app.schemas.property import Property, PropertyCreate, PropertyUpdate, PropertySearch, PropertyResponse
-from sqlalchemy import and_, or_
+from app.schemas.property import (
+    Property, PropertyCreate, PropertyUpdate, PropertySearch, PropertyResponse, PropertySummary,
+    IngestionReport
+)
+from app.schemas.user import UserResponse
+from app.services.facet_service import FacetService
+from app.services.export_service import ExportService, EXPORT_FORMATS, parquet_available
+from app.services.ingestion_service import IngestionService, INGEST_FORMATS, detect_format, iter_rows
+from app.services.listing_summary import summary_query, to_summaries
+from app.services.fx_rates import get_rates, normalize_price
+from app.services.markets import in_market, normalize_currency, normalize_market
+from app.services.search_history_buffer import search_history_buffer
+from sqlalchemy import and_, func, or_
+import io
 
 router = APIRouter()
 
+def market_filter(market: Optional[str] = Query(None, description="Market code, e.g. SE or US")) -> Optional[str]:
+    """Validated market query parameter"""
+    try:
+        return normalize_market(market)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def currency_filter(
+    currency: Optional[str] = Query(None, description="Currency of the price bounds, e.g. EUR; searches all markets' prices")
+) -> Optional[str]:
+    """Validated currency query parameter; it needs an exchange rate"""
+    try:
+        currency = normalize_currency(currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if currency is not None and currency not in get_rates():
+        raise HTTPException(status_code=400, detail=f"No exchange rate for {currency}")
+    return currency
+
+def search_filters(
+    query: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None),
+    max_price: Optional[float] = Query(None),
+    currency: Optional[str] = Depends(currency_filter),
+    min_area: Optional[float] = Query(None),
+    max_area: Optional[float] = Query(None),
+    rooms: Optional[int] = Query(None),
+    bedrooms: Optional[int] = Query(None),
+    bathrooms: Optional[int] = Query(None),
+    property_type: Optional[str] = Query(None),
+    city: Optional[str] = Query(None),
+    postal_code: Optional[str] = Query(None),
+    market: Optional[str] = Depends(market_filter)
+) -> PropertySearch:
+    """Search filters shared by the search and export endpoints"""
+    return PropertySearch(
+        query=query,
+        min_price=min_price,
+        max_price=max_price,
+        currency=currency,
+        min_area=min_area,
+        max_area=max_area,
+        rooms=rooms,
+        bedrooms=bedrooms,
+        bathrooms=bathrooms,
+        property_type=property_type,
+        city=city,
+        postal_code=postal_code,
+        market=market
+    )
+
+def apply_search_filters(db_query, filters: PropertySearch):
+    """Apply search filters to a query or select over the properties table"""
+    # Scoped to one market, searches stay within that market's index ranges
+    db_query = in_market(db_query, filters.market)
+    
+    if filters.query:
+        db_query = db_query.filter(
+            or_(
+                PropertyModel.title.ilike(f"%{filters.query}%"),
+                PropertyModel.description.ilike(f"%{filters.query}%"),
+                PropertyModel.address.ilike(f"%{filters.query}%")
+            )
+        )
+    
+    if filters.currency:
+        # Bounds in a given currency compare normalized prices, so they match every market
+        if filters.min_price is not None:
+            db_query = db_query.filter(
+                PropertyModel.price_normalized >= normalize_price(filters.min_price, filters.currency)
+            )
+        if filters.max_price is not None:
+            db_query = db_query.filter(
+                PropertyModel.price_normalized <= normalize_price(filters.max_price, filters.currency)
+            )
+    else:
+        if filters.min_price is not None:
+            db_query = db_query.filter(PropertyModel.price >= filters.min_price)
+        if filters.max_price is not None:
+            db_query = db_query.filter(PropertyModel.price <= filters.max_price)
+    if filters.min_area is not None:
+        db_query = db_query.filter(PropertyModel.area >= filters.min_area)
+    if filters.max_area is not None:
+        db_query = db_query.filter(PropertyModel.area <= filters.max_area)
+    if filters.rooms is not None:
+        db_query = db_query.filter(PropertyModel.rooms == filters.rooms)
+    if filters.bedrooms is not None:
+        db_query = db_query.filter(PropertyModel.bedrooms == filters.bedrooms)
+    if filters.bathrooms is not None:
+        db_query = db_query.filter(PropertyModel.bathrooms == filters.bathrooms)
+    if filters.property_type:
+        db_query = db_query.filter(PropertyModel.property_type == filters.property_type)
+    if filters.city:
+        db_query = db_query.filter(PropertyModel.city.ilike(f"%{filters.city}%"))
+    if filters.postal_code:
+        db_query = db_query.filter(PropertyModel.postal_code == filters.postal_code)
+    
+    return db_query
+
 @router.post("/", response_model=Property)
 async def create_property(property: PropertyCreate, db: Session = Depends(get_db)):
     """Create a new property"""
@@ -17,66 +131,73 @@ async def create_property(property: PropertyCreate, db: Session = Depends(get_db
     db.refresh(db_property)
     return db_property
 
+@router.post("/bulk", response_model=IngestionReport)
+def bulk_ingest_properties(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """Bulk upsert properties from an NDJSON or CSV feed, keyed on external_id"""
+    
+    file_format = file_format or detect_format(file.filename)
+    if file_format not in INGEST_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format, expected one of: {', '.join(INGEST_FORMATS)}"
+        )
+    
+    # Stream the upload line by line instead of reading it into memory
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return IngestionService().ingest(iter_rows(stream, file_format), db)
+
+@router.get("/export")
+async def export_properties(
+    filters: PropertySearch = Depends(search_filters),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv|parquet)$")
+):
+    """Export all properties matching the search filters as NDJSON, CSV or Parquet"""
+    
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed")
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        ExportService().stream(lambda stmt: apply_search_filters(stmt, filters), export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="properties.{extension}"'}
+    )
+
 @router.get("/{property_id}", response_model=Property)
-async def get_property(property_id: int, db: Session = Depends(get_db)):
+async def get_property(property_id: int, request: Request, db: Session = Depends(get_read_db)):
     """Get a specific property by ID"""
-    property = db.query(PropertyModel).filter(PropertyModel.id == property_id).first()
-    if not property:
+    # Validate the client's copy from the timestamps before loading the row
+    version = db.query(PropertyModel.created_at, PropertyModel.updated_at).filter(
+        PropertyModel.id == property_id
+    ).first()
+    if not version:
         raise HTTPException(status_code=404, detail="Property not found")
-    return property
+    
+    last_modified = latest(version.created_at, version.updated_at)
+    
+    def render():
+        property = db.query(PropertyModel).filter(PropertyModel.id == property_id).first()
+        return ORJSONResponse(Property.model_validate(property).model_dump(mode="json"))
+    
+    return conditional_response(request, make_etag("property", property_id, last_modified), last_modified, render)
 
 @router.get("/", response_model=PropertyResponse)
 async def search_properties(
-    query: Optional[str] = Query(None),
-    min_price: Optional[float] = Query(None),
-    max_price: Optional[float] = Query(None),
-    min_area: Optional[float] = Query(None),
-    max_area: Optional[float] = Query(None),
-    rooms: Optional[int] = Query(None),
-    bedrooms: Optional[int] = Query(None),
-    bathrooms: Optional[int] = Query(None),
-    property_type: Optional[str] = Query(None),
-    city: Optional[str] = Query(None),
-    postal_code: Optional[str] = Query(None),
+    filters: PropertySearch = Depends(search_filters),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    facets: bool = Query(False, description="Include facet counts for the filter panel"),
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: Session = Depends(get_read_db)
 ):
     """Search properties with filters"""
     
     # Build query
-    db_query = db.query(PropertyModel).filter(PropertyModel.is_active == True)
-    
-    # Apply filters
-    if query:
-        db_query = db_query.filter(
-            or_(
-                PropertyModel.title.ilike(f"%{query}%"),
-                PropertyModel.description.ilike(f"%{query}%"),
-                PropertyModel.address.ilike(f"%{query}%")
-            )
-        )
-    
-    if min_price is not None:
-        db_query = db_query.filter(PropertyModel.price >= min_price)
-    if max_price is not None:
-        db_query = db_query.filter(PropertyModel.price <= max_price)
-    if min_area is not None:
-        db_query = db_query.filter(PropertyModel.area >= min_area)
-    if max_area is not None:
-        db_query = db_query.filter(PropertyModel.area <= max_area)
-    if rooms is not None:
-        db_query = db_query.filter(PropertyModel.rooms == rooms)
-    if bedrooms is not None:
-        db_query = db_query.filter(PropertyModel.bedrooms == bedrooms)
-    if bathrooms is not None:
-        db_query = db_query.filter(PropertyModel.bathrooms == bathrooms)
-    if property_type:
-        db_query = db_query.filter(PropertyModel.property_type == property_type)
-    if city:
-        db_query = db_query.filter(PropertyModel.city.ilike(f"%{city}%"))
-    if postal_code:
-        db_query = db_query.filter(PropertyModel.postal_code == postal_code)
+    db_query = apply_search_filters(summary_query(db), filters)
     
     # Get total count
     total = db_query.count()
@@ -87,13 +208,30 @@ async def search_properties(
     
     total_pages = (total + limit - 1) // limit
     
-    return PropertyResponse(
-        properties=properties,
-        total=total,
-        page=page,
-        limit=limit,
-        total_pages=total_pages
-    )
+    # Feed recommendations with the user's searches (queued, written in batches)
+    if current_user and page == 1:
+        search_history_buffer.record(
+            user_id=current_user.id,
+            search_query=filters.query,
+            filters=filters.model_dump(exclude_none=True, exclude={"query", "page", "limit"}),
+            results_count=total
+        )
+    
+    # Summary rows are plain dicts, rendered directly without model validation
+    response = {
+        "properties": to_summaries(properties),
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": total_pages
+    }
+    
+    if facets:
+        response["facets"] = FacetService().get_facets(
+            db, filters, lambda stmt: apply_search_filters(stmt, filters)
+        )
+    
+    return ORJSONResponse(response)
 
 @router.put("/{property_id}", response_model=Property)
 async def update_property(
@@ -125,13 +263,22 @@ async def delete_property(property_id: int, db: Session = Depends(get_db)):
     db.commit()
     return {"message": "Property deleted successfully"}
 
-@router.get("/featured/", response_model=List[Property])
+@router.get("/featured/", response_model=List[PropertySummary])
 async def get_featured_properties(
+    request: Request,
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    market: Optional[str] = Depends(market_filter),
+    db: Session = Depends(get_read_db)
 ):
     """Get featured properties (most recent)"""
-    properties = db.query(PropertyModel).filter(
-        PropertyModel.is_active == True
-    ).order_by(PropertyModel.created_at.desc()).limit(limit).all()
-    return properties
+    # Any insert or update (including soft deletes) moves one of these
+    newest_created, newest_updated = in_market(db.query(
+        func.max(PropertyModel.created_at), func.max(PropertyModel.updated_at)
+    ), market).one()
+    last_modified = latest(newest_created, newest_updated)
+    
+    def render():
+        properties = in_market(summary_query(db), market).order_by(PropertyModel.created_at.desc()).limit(limit).all()
+        return ORJSONResponse(to_summaries(properties))
+    
+    return conditional_response(request, make_etag("featured", market, limit, last_modified), last_modified, render)
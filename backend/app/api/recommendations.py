@@ -1,62 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
+from app.api.properties import market_filter
+from app.core.database import get_db, get_read_db
 from app.models.ai_analysis import Recommendation
-from app.models.property import Property
-from app.models.user import User
-from app.schemas.property import Property as PropertySchema
+from app.schemas.property import PropertySummary
+from app.services.listing_summary import to_summary
 from app.services.recommendation_service import RecommendationService
 
 router = APIRouter()
 
-@router.get("/user/{user_id}/properties", response_model=List[PropertySchema])
+@router.get("/user/{user_id}/properties", response_model=List[PropertySummary])
 async def get_user_recommendations(
     user_id: int,
     limit: int = Query(10, ge=1, le=50),
     recommendation_type: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    market: Optional[str] = Depends(market_filter),
+    db: Session = Depends(get_read_db)
 ):
     """Get personalized property recommendations for a user"""
     
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Initialize recommendation service
     recommendation_service = RecommendationService()
     
     try:
-        # Get recommendations
+        # Get recommendations, already hydrated and sorted by score
         recommendations = await recommendation_service.get_user_recommendations(
-            user_id, db, limit, recommendation_type
+            user_id, db, limit, recommendation_type, market
         )
-        
-        # Get property details
-        property_ids = [rec["property_id"] for rec in recommendations]
-        properties = db.query(Property).filter(
-            Property.id.in_(property_ids),
-            Property.is_active == True
-        ).all()
-        
-        # Sort properties by recommendation score
-        property_dict = {p.id: p for p in properties}
-        sorted_properties = []
-        for rec in recommendations:
-            if rec["property_id"] in property_dict:
-                sorted_properties.append(property_dict[rec["property_id"]])
-        
-        return sorted_properties
-        
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
+    
+    return ORJSONResponse([to_summary(rec["property"]) for rec in recommendations])
 
-@router.get("/style-based", response_model=List[PropertySchema])
+@router.get("/style-based", response_model=List[PropertySummary])
 async def get_style_based_recommendations(
     style_keywords: List[str] = Query(...),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    market: Optional[str] = Depends(market_filter),
+    db: Session = Depends(get_read_db)
 ):
     """Get property recommendations based on style keywords"""
     
@@ -65,67 +50,34 @@ async def get_style_based_recommendations(
     try:
         # Get style-based recommendations
         recommendations = await recommendation_service.get_style_based_recommendations(
-            style_keywords, db, limit
+            style_keywords, db, limit, market
         )
-        
-        # Get property details
-        property_ids = [rec["property_id"] for rec in recommendations]
-        properties = db.query(Property).filter(
-            Property.id.in_(property_ids),
-            Property.is_active == True
-        ).all()
-        
-        # Sort properties by recommendation score
-        property_dict = {p.id: p for p in properties}
-        sorted_properties = []
-        for rec in recommendations:
-            if rec["property_id"] in property_dict:
-                sorted_properties.append(property_dict[rec["property_id"]])
-        
-        return sorted_properties
-        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get style recommendations: {str(e)}")
+    
+    return ORJSONResponse([to_summary(rec["property"]) for rec in recommendations])
 
-@router.get("/similar/{property_id}", response_model=List[PropertySchema])
+@router.get("/similar/{property_id}", response_model=List[PropertySummary])
 async def get_similar_properties(
     property_id: int,
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get properties similar to the given property"""
     
-    # Check if property exists
-    property = db.query(Property).filter(Property.id == property_id).first()
-    if not property:
-        raise HTTPException(status_code=404, detail="Property not found")
-    
     recommendation_service = RecommendationService()
     
     try:
-        # Get similar properties
+        # Get similar properties, sorted by similarity score
         recommendations = await recommendation_service.get_similar_properties(
             property_id, db, limit
         )
-        
-        # Get property details
-        property_ids = [rec["property_id"] for rec in recommendations]
-        properties = db.query(Property).filter(
-            Property.id.in_(property_ids),
-            Property.is_active == True
-        ).all()
-        
-        # Sort properties by similarity score
-        property_dict = {p.id: p for p in properties}
-        sorted_properties = []
-        for rec in recommendations:
-            if rec["property_id"] in property_dict:
-                sorted_properties.append(property_dict[rec["property_id"]])
-        
-        return sorted_properties
-        
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Property not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get similar properties: {str(e)}")
+    
+    return ORJSONResponse([to_summary(rec["property"]) for rec in recommendations])
 
 @router.post("/feedback")
 async def submit_recommendation_feedback(
@@ -146,34 +98,20 @@ async def submit_recommendation_feedback(
     
     return {"message": "Feedback submitted successfully"}
 
-@router.get("/trending", response_model=List[PropertySchema])
+@router.get("/trending", response_model=List[PropertySummary])
 async def get_trending_properties(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    market: Optional[str] = Depends(market_filter),
+    db: Session = Depends(get_read_db)
 ):
     """Get trending properties based on views and interactions"""
     
     recommendation_service = RecommendationService()
     
     try:
-        # Get trending properties
-        recommendations = await recommendation_service.get_trending_properties(db, limit)
-        
-        # Get property details
-        property_ids = [rec["property_id"] for rec in recommendations]
-        properties = db.query(Property).filter(
-            Property.id.in_(property_ids),
-            Property.is_active == True
-        ).all()
-        
-        # Sort properties by trending score
-        property_dict = {p.id: p for p in properties}
-        sorted_properties = []
-        for rec in recommendations:
-            if rec["property_id"] in property_dict:
-                sorted_properties.append(property_dict[rec["property_id"]])
-        
-        return sorted_properties
-        
+        # Get trending properties, sorted by trending score
+        recommendations = await recommendation_service.get_trending_properties(db, limit, market)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get trending properties: {str(e)}")
+    
+    return ORJSONResponse([to_summary(rec["property"]) for rec in recommendations])
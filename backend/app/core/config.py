@@ -1,14 +1,24 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./homegenius.db"
+    DATABASE_REPLICA_URLS: List[str] = []  # Read replicas for GET handlers and background reads
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    REPLICA_MAX_LAG_SECONDS: float = 10.0  # PostgreSQL replicas further behind are skipped
+    READ_YOUR_WRITES_SECONDS: int = 15  # Clients read from the primary this long after a write
+    READ_YOUR_WRITES_COOKIE: str = "hg_read_primary_until"
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on the next login when this changes
+    PASSWORD_HASH_WORKERS: int = 2  # Threads dedicated to bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Hashing operations queued or running before rejecting
+    USER_CACHE_SIZE: int = 10000  # Authenticated user principals kept in memory
+    USER_CACHE_TTL_SECONDS: int = 60  # The cache is per process: other workers may accept a deactivated user for this long
     
     # CORS
     ALLOWED_HOSTS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -16,6 +26,86 @@ class Settings(BaseSettings):
     # AI Models
     MODEL_PATH: str = "ai_models/models"
     UPLOAD_PATH: str = "uploads"
+    AI_PRELOAD_MODELS: bool = False  # Load models at startup instead of on first inference
+    INFERENCE_WORKERS: int = 0  # Inference processes per API process; 0 runs inference in-process
+    INFERENCE_START_METHOD: str = "spawn"  # multiprocessing start method for inference workers
+    INFERENCE_MAX_CONCURRENCY: int = 4  # Analyses running at once per API process; 0 disables the cap
+    INFERENCE_MAX_QUEUE: int = 16  # Analyses waiting for a slot before new ones are rejected
+    INFERENCE_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ANALYSIS_FRESHNESS_SECONDS: float = 60.0  # Return a stored analysis this recent instead of recomputing; 0 disables
+    
+    # Markets (the catalog is stored per market, see Property.market)
+    MARKETS: List[str] = ["SE", "US", "UK", "DE", "FR"]
+    DEFAULT_MARKET: str = "SE"  # Market of listings created without one
+    MARKET_CURRENCIES: Dict[str, str] = {"SE": "SEK", "US": "USD", "UK": "GBP", "DE": "EUR", "FR": "EUR"}
+    
+    # Currency normalization (price_normalized is stored in BASE_CURRENCY)
+    BASE_CURRENCY: str = "EUR"
+    FX_RATES_FILE: str = ""  # JSON or CSV rates loaded at startup; empty keeps the stored rates
+    FX_CACHE_TTL_SECONDS: int = 300
+    FX_RENORMALIZE_BATCH_SIZE: int = 10000  # Listings re-priced per UPDATE when rates change
+    
+    # Rate limiting (token buckets per user, or per client address when anonymous)
+    RATE_LIMITS: Dict[str, str] = {
+        "analyze_property": "30/minute",
+        "analyze_image": "10/minute",
+    }
+    RATE_LIMIT_BACKEND: str = "memory"  # One of rate_limit.BACKENDS
+    RATE_LIMIT_MAX_KEYS: int = 100000  # Buckets kept by the in-memory backend
+    
+    # Bulk ingestion and export
+    INGEST_BATCH_SIZE: int = 1000  # Rows per INSERT ... ON CONFLICT batch
+    INGEST_MAX_REPORTED_ERRORS: int = 1000
+    EXPORT_BATCH_SIZE: int = 5000  # Rows fetched per server-side cursor batch when exporting
+    
+    # Search facets
+    FACET_PRICE_BUCKET_SIZE: float = 500000  # Width of price histogram buckets
+    FACET_AREA_BUCKET_SIZE: float = 25  # Width of area histogram buckets (m²)
+    FACET_CACHE_SIZE: int = 1024
+    FACET_CACHE_TTL_SECONDS: int = 60
+    
+    # Search history (write-behind)
+    SEARCH_HISTORY_BUFFER_SIZE: int = 10000  # Queued events before new ones are dropped
+    SEARCH_HISTORY_BATCH_SIZE: int = 500
+    SEARCH_HISTORY_FLUSH_SECONDS: float = 5.0
+    
+    # AI analysis history retention
+    ANALYSIS_RETENTION_KEEP_LATEST: int = 10  # Analyses kept in full per property and type
+    ANALYSIS_RETENTION_MIN_AGE_DAYS: int = 30  # Younger analyses are never compacted
+    ANALYSIS_COMPACTION_BATCH_SIZE: int = 1000  # Analyses deleted per transaction
+    ANALYSIS_COMPACTION_INTERVAL_SECONDS: int = 0  # Background compaction interval; 0 disables it
+    ANALYSIS_ARCHIVE_DIR: str = ""  # Archive compacted analyses as gzipped NDJSON here; empty disables
+    
+    # Recommendations
+    CF_WEIGHT: float = 0.5  # Share of the score coming from item-item collaborative filtering
+    CF_CANDIDATES: int = 100  # Collaborative candidates considered per request
+    CF_REFRESH_SECONDS: int = 600  # Background rebuild interval of the item similarity index
+    CF_NEIGHBORS: int = 50  # Most similar items kept per item; bounds the index's memory
+    RECOMMENDATION_CANDIDATES: int = 2000  # Preference candidates scored per request
+    USER_PROFILE_CACHE_SIZE: int = 10000  # Compiled preference profiles kept in memory
+    USER_PROFILE_CACHE_TTL_SECONDS: int = 300  # Bounds how long new searches take to affect scoring
+    PROFILE_MIN_TERM_LENGTH: int = 3  # Shorter search terms are ignored when matching titles
+    
+    # HTTP caching of property and analysis reads
+    HTTP_CACHE_MAX_AGE: int = 30  # Seconds browsers may reuse a response without revalidating
+    HTTP_CACHE_SHARED_MAX_AGE: int = 60  # Same for CDNs and shared proxies
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = 300
+    
+    # Observability
+    METRICS_ENABLED: bool = True  # Record request metrics and serve them on /metrics
+    QUERY_LOG_ENABLED: bool = True  # Report N+1 statement patterns per request
+    QUERY_LOG_MAX_STATEMENTS: int = 1000  # Statements kept per request for inspection
+    SLOW_QUERY_MS: float = 200  # Log statements slower than this; 0 disables the slow-query log
+    SLOW_QUERY_EXPLAIN: bool = False  # Include the query plan of slow SELECTs in the log
+    N_PLUS_ONE_THRESHOLD: int = 5  # Executions of the same statement shape in one request
+    QUERY_LOG_RAISE_ON_N_PLUS_ONE: bool = False  # Raise NPlusOneError instead of logging (test mode)
+    PROFILING_ENABLED: bool = False  # Install the request profiling middleware and /api/profiling
+    PROFILING_TOKEN: str = ""  # Required in X-Profile-Token to request or download profiles
+    PROFILING_MODE: str = "sampler"  # Default profiler: sampler (folded stacks) or cprofile
+    PROFILING_SAMPLE_RATE: float = 0.0  # Share of all requests profiled without a header
+    PROFILING_SAMPLE_INTERVAL: float = 0.005  # Seconds between stack samples
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200  # Oldest profiles are deleted beyond this
     
     # External APIs
     MAPS_API_KEY: str = ""
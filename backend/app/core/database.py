@@ -1,16 +1,73 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from app.core.config import settings
+from app.core.replicas import record_write, reads_from_primary, replicas
 
 engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class RoutingSession(Session):
+    """Session sending reads to a read replica when ``info["use_replica"]`` is set.
+
+    Writes, locking reads and everything after the session's first write go
+    to the primary. A session sticks to the replica it first picked, so one
+    request never mixes replicas at different replication positions.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None):
+            self.info["primary"] = True
+            self.info["pending_write"] = True
+        if self.info.get("primary") or not self.info.get("use_replica"):
+            return engine
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.choose()
+        return self.info["replica"] or engine
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    if session.info.pop("pending_write", False):
+        record_write()
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("pending_write", None)
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+# For read paths outside a request, e.g. exports and index rebuilds
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, info={"use_replica": True}
+)
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    """Current UTC time with microseconds, for timestamps that back ETags
+    (``func.now()`` on SQLite only has one-second resolution)"""
+    return datetime.now(timezone.utc)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Session for GET handlers: reads from a replica unless the client just wrote"""
+    db = SessionLocal() if reads_from_primary() else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def init_db():
+    """Create database tables for all models and upgrade existing ones; returns the upgrades made"""
+    # Import models so they are registered on Base.metadata
+    from app.models import property, user, ai_analysis, fx_rate  # noqa: F401
+    from app.core.schema import upgrade_schema
+
+    Base.metadata.create_all(bind=engine)
+    return upgrade_schema(engine)
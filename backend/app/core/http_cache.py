@@ -0,0 +1,79 @@
+"""Conditional GET support.
+
+Endpoints compute cheap validators (timestamps, counts) before loading and
+serializing a resource. When the client's ``If-None-Match`` or
+``If-Modified-Since`` still matches, a bodiless 304 is returned instead.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from fastapi import Request, Response
+from app.core.config import settings
+
+def make_etag(*validators: Any) -> str:
+    """Strong ETag derived from the values that change whenever the representation does"""
+    digest = hashlib.blake2b(repr(validators).encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive timestamps; server_default=func.now() stores UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    values = [_as_utc(value) for value in timestamps if value is not None]
+    return max(values) if values else None
+
+def cache_control(max_age: Optional[int] = None) -> str:
+    max_age = settings.HTTP_CACHE_MAX_AGE if max_age is None else max_age
+    return (
+        f"public, max-age={max_age}, s-maxage={settings.HTTP_CACHE_SHARED_MAX_AGE}, "
+        f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+    )
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is not None:
+            return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime], max_age: Optional[int] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control(max_age)}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+def conditional_response(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime],
+    render: Callable[[], Response],
+    max_age: Optional[int] = None
+) -> Response:
+    """Return 304 if the client's copy is current, otherwise ``render()`` with validators attached"""
+    headers = validator_headers(etag, last_modified, max_age)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response = render()
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,250 @@
+"""In-process metrics exposed in the Prometheus text format.
+
+Counters, gauges and histograms live in a single ``registry``; components
+that already keep their own counters (caches, the password hasher, buffers)
+register a stats callback instead and are sampled when ``/metrics`` is
+scraped. Each API process reports its own values, Prometheus aggregates
+across processes.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+from app.core.query_log import track_queries
+
+# Seconds; the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (non-cumulative, last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._stats: List[Tuple[str, str, Callable[[], Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, description, labelnames))
+
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def register_stats(self, prefix: str, description: str, stats: Callable[[], Dict[str, Any]]):
+        """Export the numeric values of ``stats()`` as gauges named ``<prefix>_<key>``"""
+        with self._lock:
+            self._stats.append((prefix, description, stats))
+
+    def _render_stats(self) -> Iterable[str]:
+        for prefix, description, stats in self._stats:
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Warning: Could not collect {prefix} metrics: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                yield f"# HELP {name} {description}: {key}"
+                yield f"# TYPE {name} gauge"
+                yield f"{name} {_format_value(value)}"
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        lines.extend(self._render_stats())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# HTTP and database metrics recorded by MetricsMiddleware
+
+REQUEST_SECONDS = registry.histogram(
+    "homegenius_http_request_duration_seconds", "Request latency by route", ["method", "route"]
+)
+REQUESTS_TOTAL = registry.counter(
+    "homegenius_http_requests_total", "Requests by route and status code", ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "homegenius_http_requests_in_flight", "Requests currently being handled"
+)
+RESPONSE_BYTES = registry.histogram(
+    "homegenius_http_response_size_bytes", "Response body size by route", ["method", "route"], SIZE_BUCKETS
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "homegenius_http_request_db_seconds", "Time spent in database queries per request", ["method", "route"]
+)
+DB_QUERIES_TOTAL = registry.counter(
+    "homegenius_db_queries_total", "Database statements executed by route", ["route"]
+)
+
+def _route_template(scope) -> str:
+    """The path template of the matched route, e.g. ``/api/properties/{property_id}``
+
+    Templates rather than raw paths keep the number of label values bounded.
+    """
+    app = scope.get("app")
+    endpoint = scope.get("endpoint")
+    if app is None or endpoint is None:
+        return "unmatched"
+
+    templates = getattr(app.state, "metrics_route_templates", None)
+    if templates is None:
+        templates = {}
+        for route in app.routes:
+            if hasattr(route, "endpoint"):
+                templates[route.endpoint] = route.path
+            elif hasattr(route, "app"):
+                templates[route.app] = route.path + "/{path}"
+        app.state.metrics_route_templates = templates
+    return templates.get(endpoint, "unmatched")
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status, size and DB time per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        method = scope["method"]
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        with track_queries(f"{method} {scope['path']}") as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                REQUESTS_IN_FLIGHT.dec()
+
+                route = _route_template(scope)
+                REQUEST_SECONDS.observe(elapsed, method=method, route=route)
+                REQUESTS_TOTAL.inc(method=method, route=route, status=status_code)
+                RESPONSE_BYTES.observe(response_bytes, method=method, route=route)
+                REQUEST_DB_SECONDS.observe(queries.seconds, method=method, route=route)
+                if queries.count:
+                    DB_QUERIES_TOTAL.inc(queries.count, route=route)
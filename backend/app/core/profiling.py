@@ -0,0 +1,190 @@
+"""Opt-in per-request profiling.
+
+When ``PROFILING_ENABLED`` is set, ``ProfilingMiddleware`` profiles requests
+that carry ``X-Profile: cprofile|sampler`` together with a valid
+``X-Profile-Token``, plus a random ``PROFILING_SAMPLE_RATE`` share of all
+requests. Profiles are written to ``PROFILE_DIR`` and can be downloaded
+through ``/api/profiling``:
+
+- ``cprofile``: deterministic ``cProfile`` output (``.prof``), readable with
+  ``pstats``, snakeviz or flameprof.
+- ``sampler``: a low-overhead stack sampler writing folded stacks
+  (``.folded``) for flamegraph.pl or speedscope.
+
+``cProfile`` only instruments the thread that enabled it, the event loop
+thread: sync (``def``) routes and dependencies run on the threadpool and show
+up as a bare await. Requests for a sync route are therefore profiled with the
+sampler even when ``cprofile`` is asked for. The sampler sees every thread in
+the process, including other requests handled at the same time, so profile
+under representative rather than peak concurrency. When profiling is disabled
+the middleware is not installed at all.
+"""
+import asyncio
+import cProfile
+import hmac
+import inspect
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from starlette.routing import Match
+from app.core.config import settings
+
+PROFILE_MODES = {"cprofile": "prof", "sampler": "folded"}
+
+_PROFILE_ID = re.compile(r"^[\w.-]+\.(prof|folded)$")
+_SLUG = re.compile(r"[^\w]+")
+
+def token_valid(token: Optional[str]) -> bool:
+    return bool(settings.PROFILING_TOKEN) and token is not None and hmac.compare_digest(
+        token.encode(), settings.PROFILING_TOKEN.encode()
+    )
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile, or None if the id is invalid or unknown"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, profile_id)
+    return path if os.path.isfile(path) else None
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(settings.PROFILE_DIR):
+        if entry.is_file() and _PROFILE_ID.match(entry.name):
+            stat = entry.stat()
+            profiles.append({"id": entry.name, "size": stat.st_size, "created_at": stat.st_mtime})
+    return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+def _prune():
+    for profile in list_profiles()[settings.PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(settings.PROFILE_DIR, profile["id"]))
+        except OSError:
+            pass
+
+def _runs_in_threadpool(scope) -> bool:
+    """Whether the route handling ``scope`` is a sync endpoint"""
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            endpoint = getattr(route, "endpoint", None)
+            return endpoint is not None and not inspect.iscoroutinefunction(endpoint)
+    return False
+
+class StackSampler:
+    """Samples the stacks of all other threads at a fixed interval"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware wrapping selected requests in a profiler"""
+
+    def __init__(self, app):
+        self.app = app
+        # cProfile cannot run two profilers at once; overlapping requests are not profiled
+        self._active = threading.Lock()
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers") or [])
+        mode = headers.get(b"x-profile")
+        if mode is not None:
+            mode = mode.decode("latin-1").lower()
+            token = headers.get(b"x-profile-token")
+            if token_valid(token.decode("latin-1") if token else None):
+                return mode if mode in PROFILE_MODES else settings.PROFILING_MODE
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return settings.PROFILING_MODE
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/api/profiling"):
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope)
+        if mode == "cprofile" and _runs_in_threadpool(scope):
+            mode = "sampler"
+        if mode is None or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        slug = _SLUG.sub("-", scope["path"]).strip("-") or "root"
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}.{PROFILE_MODES[mode]}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profiler.disable()
+                output = profiler.dump_stats
+            else:
+                sampler = StackSampler(settings.PROFILING_SAMPLE_INTERVAL)
+                sampler.start()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    sampler.stop()
+                folded = sampler.folded()
+
+                def output(path):
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(folded)
+        finally:
+            self._active.release()
+
+        await asyncio.to_thread(self._store, profile_id, output)
+
+    def _store(self, profile_id: str, output):
+        try:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            output(os.path.join(settings.PROFILE_DIR, profile_id))
+            _prune()
+        except OSError as e:
+            print(f"Warning: Could not store profile {profile_id}: {e}")
@@ -0,0 +1,149 @@
+"""Per-request SQL tracking: slow-query log and N+1 detection.
+
+Engine cursor events record the text, duration and row count of every
+statement executed while a request (or an explicit ``track_queries()``
+block) is being handled. Statements slower than ``SLOW_QUERY_MS`` are logged,
+optionally with their query plan. Statements that repeat with only their
+literals or parameters changing are reported as N+1 patterns, and raise
+``NPlusOneError`` when ``QUERY_LOG_RAISE_ON_N_PLUS_ONE`` is set (test mode).
+"""
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+from app.core.config import settings
+
+class NPlusOneError(Exception):
+    """Raised in test mode when a statement repeats within one request"""
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\([^)]*\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\([^)]*\)s|%s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a statement to its shape, so statements differing only in
+    literals, bound parameters or IN-list length compare equal"""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+class QueryRecord:
+    __slots__ = ("statement", "duration", "rowcount")
+
+    def __init__(self, statement: str, duration: float, rowcount: Optional[int]):
+        self.statement = statement
+        self.duration = duration
+        self.rowcount = rowcount
+
+class RequestQueries:
+    """Statements executed on behalf of one request"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.seconds = 0.0
+        self.count = 0
+        self.records: List[QueryRecord] = []
+        self.shapes: Dict[str, int] = {}
+        self.reported: set = set()
+
+    def add(self, statement: str, duration: float, rowcount: Optional[int]) -> int:
+        """Record a statement and return how often its shape has been seen"""
+        self.seconds += duration
+        self.count += 1
+        if len(self.records) < settings.QUERY_LOG_MAX_STATEMENTS:
+            self.records.append(QueryRecord(statement, duration, rowcount))
+        shape = normalize_statement(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+        return self.shapes[shape]
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[RequestQueries]:
+    """Track statements executed inside the block.
+
+    Nested blocks share the outermost tracker, so the middleware and tests
+    can both use this without double counting.
+    """
+    queries = _current.get()
+    if queries is not None:
+        yield queries
+        return
+
+    queries = RequestQueries(label)
+    token = _current.set(queries)
+    try:
+        yield queries
+    finally:
+        _current.reset(token)
+
+def _explain(cursor, dialect: str, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        return "\n".join("    " + " | ".join(str(value) for value in row) for row in explain_cursor.fetchall())
+    except Exception as e:
+        return f"    EXPLAIN failed: {e}"
+    finally:
+        explain_cursor.close()
+
+def instrument_engine(engine):
+    """Record statements run on ``engine`` for the request being handled"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+        rowcount = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+
+        queries = _current.get()
+        label = queries.label if queries is not None else "background"
+
+        if settings.SLOW_QUERY_MS and duration * 1000 >= settings.SLOW_QUERY_MS:
+            message = f"Slow query ({duration * 1000:.1f} ms, rows: {rowcount}) in {label}: {statement}"
+            if settings.SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith("SELECT"):
+                message += "\n" + _explain(cursor, conn.dialect.name, statement, parameters)
+            print(f"Warning: {message}")
+
+        if queries is None:
+            return
+
+        seen = queries.add(statement, duration, rowcount)
+        if seen == settings.N_PLUS_ONE_THRESHOLD and settings.QUERY_LOG_RAISE_ON_N_PLUS_ONE:
+            raise NPlusOneError(
+                f"Statement executed {seen} times in {label}: {normalize_statement(statement)}"
+            )
+
+def report_repeated(queries: RequestQueries):
+    """Log the N+1 patterns found in a finished request"""
+    for shape, count in queries.repeated(settings.N_PLUS_ONE_THRESHOLD).items():
+        print(f"Warning: Possible N+1 in {queries.label}: statement executed {count} times: {shape}")
+
+class QueryLogMiddleware:
+    """Pure ASGI middleware tracking the statements of each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as queries:
+            await self.app(scope, receive, send)
+        report_repeated(queries)
@@ -0,0 +1,184 @@
+import asyncio
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller has used up its token bucket"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class InferenceOverloadedError(Exception):
+    """Raised when the inference queue is full or a request waited too long for a slot"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Inference capacity exhausted")
+        self.retry_after = retry_after
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """Parse ``"10/minute"`` into (bucket capacity, tokens refilled per second)"""
+    count, _, period = limit.partition("/")
+    seconds = PERIODS.get(period.strip().rstrip("s"))
+    if seconds is None or float(count) <= 0:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '10/minute'")
+    return float(count), float(count) / seconds
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets; subclass to share limits across processes"""
+
+    @abstractmethod
+    def consume(self, key: str, capacity: float, refill_rate: float) -> float:
+        """Take one token from ``key``'s bucket and return 0, or the seconds
+        until a token becomes available if the bucket is empty"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Token buckets kept in process memory, least recently used evicted first"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: float, refill_rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys}
+
+BACKENDS: Dict[str, Callable[[], RateLimitBackend]] = {
+    "memory": lambda: InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS),
+}
+
+def create_backend(name: str) -> RateLimitBackend:
+    """The backend configured as ``RATE_LIMIT_BACKEND``"""
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Invalid RATE_LIMIT_BACKEND {name!r}, expected one of: {', '.join(sorted(BACKENDS))}")
+    return factory()
+
+class RateLimiter:
+    """Per-caller token bucket limits, configured by route name in ``RATE_LIMITS``"""
+
+    def __init__(self, limits: Dict[str, str], backend: RateLimitBackend):
+        self.limits = {route: parse_limit(limit) for route, limit in limits.items()}
+        self.backend = backend
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, route: str, key: str):
+        limit = self.limits.get(route)
+        if limit is None:
+            return
+        retry_after = self.backend.consume(f"{route}:{key}", *limit)
+        if retry_after:
+            self.rejected += 1
+            raise RateLimitExceeded(retry_after)
+        self.allowed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"allowed": self.allowed, "rejected": self.rejected, **self.backend.stats()}
+
+class ConcurrencyLimiter:
+    """Caps concurrent inference work across all requests of this process.
+
+    Up to ``max_concurrent`` requests hold a slot; up to ``max_queue`` more wait
+    for one, for at most ``queue_timeout`` seconds. Anything beyond that is
+    rejected immediately, so a burst of uploads cannot starve other traffic.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Only updated from the event loop thread
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+
+    def retry_after(self) -> float:
+        """Rough time until a queued request would get a slot"""
+        average = self.total_seconds / self.completed if self.completed else 1.0
+        return max(1.0, average * (self.waiting + 1) / self.max_concurrent)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.max_concurrent <= 0:
+            yield
+            return
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise InferenceOverloadedError(self.retry_after())
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise InferenceOverloadedError(self.retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(math.ceil(seconds))}
+
+rate_limiter = RateLimiter(settings.RATE_LIMITS, create_backend(settings.RATE_LIMIT_BACKEND))
+
+inference_limiter = ConcurrencyLimiter(
+    max_concurrent=settings.INFERENCE_MAX_CONCURRENCY,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+    queue_timeout=settings.INFERENCE_QUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,180 @@
+"""Read replica routing.
+
+``ReplicaSet`` holds one engine per URL in ``DATABASE_REPLICA_URLS`` and a
+background health check per process. Replicas that fail to answer, or lag
+more than ``REPLICA_MAX_LAG_SECONDS`` behind (PostgreSQL), are skipped
+until they recover; with none healthy, reads go to the primary. Replicas
+only take reads once their first check has passed.
+
+Read-your-writes: when a request commits a write, ``ReadYourWritesMiddleware``
+sets a short-lived cookie, and requests carrying it read from the primary
+until replication has caught up.
+"""
+import itertools
+import os
+import threading
+import time
+from contextvars import ContextVar
+from http.cookies import CookieError, SimpleCookie
+from typing import Any, Dict, List, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+
+class RequestConsistency:
+    """What the current request has written, and whether it must read from the primary"""
+
+    def __init__(self, read_primary: bool):
+        self.read_primary = read_primary
+        self.wrote = False
+
+_consistency: ContextVar[Optional[RequestConsistency]] = ContextVar("request_consistency", default=None)
+
+def reads_from_primary() -> bool:
+    consistency = _consistency.get()
+    return consistency is not None and consistency.read_primary
+
+def record_write():
+    """Called when a session commits a write, to pin the client to the primary for a while"""
+    consistency = _consistency.get()
+    if consistency is not None:
+        consistency.wrote = True
+
+class ReplicaSet:
+    """Read replicas, picked round-robin among the healthy ones"""
+
+    def __init__(self, urls: List[str], check_interval: float, max_lag: float):
+        self.engines: List[Engine] = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self._healthy = [False] * len(self.engines)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self.failed_checks = 0
+
+        for index, engine in enumerate(self.engines):
+            event.listen(engine, "handle_error", self._on_error(index))
+
+    def _on_error(self, index: int):
+        def handle_error(context):
+            # Lost connections take the replica out of rotation until the next check
+            if context.is_disconnect or context.connection is None:
+                self._healthy[index] = False
+        return handle_error
+
+    def start(self):
+        """Start this process's health check thread; checks never run on the caller's thread"""
+        # Threads do not survive the pre-fork launcher, so each process starts its own
+        if not self.engines or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="replica-health", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._check_all()
+            time.sleep(self.check_interval)
+
+    def _check_all(self):
+        for index, engine in enumerate(self.engines):
+            healthy = self._check(engine)
+            if not healthy:
+                self.failed_checks += 1
+            self._healthy[index] = healthy
+
+    def _check(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name != "postgresql":
+                    connection.execute(text("SELECT 1"))
+                    return True
+                # The last replayed transaction only dates the lag while WAL is still
+                # waiting to be replayed; a caught-up replica of an idle primary has none
+                lag = connection.execute(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() IS NOT DISTINCT FROM pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                )).scalar()
+                return lag is None or lag <= self.max_lag
+        except SQLAlchemyError as e:
+            print(f"Warning: Read replica {engine.url.render_as_string(hide_password=True)} is unavailable: {e}")
+            return False
+
+    def choose(self) -> Optional[Engine]:
+        """A healthy replica, or None when reads must go to the primary"""
+        if not self.engines:
+            return None
+        self.start()
+        for _ in range(len(self.engines)):
+            index = next(self._next) % len(self.engines)
+            if self._healthy[index]:
+                self.replica_reads += 1
+                return self.engines[index]
+        self.primary_fallbacks += 1
+        return None
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": len(self.engines),
+            "healthy": sum(self._healthy),
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "failed_checks": self.failed_checks,
+        }
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware pinning a client to the primary right after it wrote"""
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = settings.READ_YOUR_WRITES_COOKIE
+
+    def _pinned(self, scope) -> bool:
+        header = dict(scope.get("headers") or []).get(b"cookie")
+        if not header:
+            return False
+        try:
+            morsel = SimpleCookie(header.decode("latin-1")).get(self.cookie)
+            return morsel is not None and float(morsel.value) > time.time()
+        except (CookieError, ValueError):
+            return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        consistency = RequestConsistency(read_primary=self._pinned(scope))
+        token = _consistency.set(consistency)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and consistency.wrote:
+                seconds = settings.READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{self.cookie}={time.time() + seconds:.0f}; Max-Age={seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _consistency.reset(token)
+
+replicas = ReplicaSet(
+    settings.DATABASE_REPLICA_URLS,
+    check_interval=settings.REPLICA_HEALTH_CHECK_SECONDS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+)
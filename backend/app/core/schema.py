@@ -0,0 +1,66 @@
+"""Upgrades for databases created by an earlier version of the models.
+
+``Base.metadata.create_all`` creates missing tables but leaves existing ones
+untouched, so columns and indexes added to a model later never reach a
+deployed database. ``upgrade_schema`` adds the columns listed in
+``COLUMN_UPGRADES`` to existing tables, backfills them, and creates every
+model index that is missing. It is idempotent; ``init_db`` runs it after
+``create_all`` and ``scripts/upgrade_schema.py`` runs it on its own.
+"""
+from typing import List, NamedTuple, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from app.core.config import settings
+from app.core.database import Base
+
+class ColumnUpgrade(NamedTuple):
+    table: str
+    column: str
+    backfill: Optional[str] = None  # SQL run once, right after the column is added
+
+# Columns added to tables that existed before them, oldest first
+COLUMN_UPGRADES: List[ColumnUpgrade] = [
+    ColumnUpgrade("properties", "external_id"),
+    # Existing listings get the server default, DEFAULT_MARKET
+    ColumnUpgrade("properties", "market"),
+    ColumnUpgrade("properties", "currency", backfill="UPDATE properties SET currency = CASE market {} ELSE currency END".format(
+        " ".join(f"WHEN '{market}' THEN '{currency}'" for market, currency in settings.MARKET_CURRENCIES.items())
+    )),
+    # Listings without a rate stay NULL until load_rates supplies one
+    ColumnUpgrade("properties", "price_normalized", backfill=(
+        f"UPDATE properties SET price_normalized = CASE currency WHEN '{settings.BASE_CURRENCY}' THEN price "
+        "ELSE price / (SELECT units_per_base FROM fx_rates WHERE fx_rates.currency = properties.currency) END"
+    )),
+]
+
+def upgrade_schema(engine) -> List[str]:
+    """Bring existing tables up to the models; returns the changes made"""
+    changes = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        tables = set(inspector.get_table_names())
+
+        for upgrade in COLUMN_UPGRADES:
+            if upgrade.table not in tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(upgrade.table)}
+            if upgrade.column in existing:
+                continue
+            # Rendered from the model: type, server default and NOT NULL. Unique
+            # constraints come from the model's indexes below.
+            column = Base.metadata.tables[upgrade.table].c[upgrade.column]
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {upgrade.table} ADD COLUMN {ddl}"))
+            if upgrade.backfill:
+                connection.execute(text(upgrade.backfill))
+            changes.append(f"added {upgrade.table}.{upgrade.column}")
+
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(connection)
+                    changes.append(f"created index {index.name}")
+    return changes
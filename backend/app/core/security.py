@@ -0,0 +1,79 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from passlib.context import CryptContext
+from app.core.config import settings
+
+class HashingOverloadedError(Exception):
+    """Raised when too many password hashing operations are already pending"""
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded thread pool.
+
+    At most ``max_pending`` operations may be queued or running at once; further
+    calls are rejected immediately with ``HashingOverloadedError`` instead of
+    piling up behind a login burst.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+        # Only updated from the event loop thread
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    async def _run(self, func, *args) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HashingOverloadedError()
+
+        self.pending += 1
+        queued_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at = await loop.run_in_executor(self._executor, self._timed, func, args)
+        finally:
+            self.pending -= 1
+
+        finished_at = time.perf_counter()
+        self.completed += 1
+        self.total_wait_seconds += started_at - queued_at
+        self.total_seconds += finished_at - started_at
+        self.max_seconds = max(self.max_seconds, finished_at - started_at)
+        return result
+
+    @staticmethod
+    def _timed(func, args) -> Tuple[Any, float]:
+        started_at = time.perf_counter()
+        return func(*args), started_at
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password, returning a new hash if the stored one uses outdated settings"""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            "max_seconds": self.max_seconds,
+            "avg_wait_seconds": self.total_wait_seconds / self.completed if self.completed else 0.0,
+        }
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
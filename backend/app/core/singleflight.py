@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one computation.
+
+    The first caller for a key runs ``fn()`` as its own task; callers arriving
+    while it runs await that task and get the same result or exception. The
+    task is shielded, so a caller that disconnects does not cancel the work
+    others are waiting for. Calls are only shared within one process.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+        # Only updated from the event loop thread
+        self.started = 0
+        self.shared = 0
+        self.failed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.started += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Retrieving the exception also keeps asyncio from logging it as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "shared": self.shared,
+            "failed": self.failed,
+        }
@@ -1,27 +1,32 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 import os
 
-from app.api import properties, ai_analysis, recommendations, auth
+from app.api import properties, ai_analysis, recommendations, auth, profiling
+from app.core import metrics, query_log
+from app.core.profiling import ProfilingMiddleware
+from app.core.replicas import ReadYourWritesMiddleware, replicas
+from app.core.rate_limit import inference_limiter, rate_limiter
 from app.core.config import settings
-from app.core.database import engine
-from app.models import property, user, ai_analysis as ai_models
-
-# Create database tables (with error handling)
-try:
-    property.Base.metadata.create_all(bind=engine)
-    user.Base.metadata.create_all(bind=engine)
-    ai_models.Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully")
-except Exception as e:
-    print(f"Warning: Could not create database tables: {e}")
-    print("Server will start but database features may not work")
+from app.core.database import engine, init_db
+from app.core.security import password_hasher
+from app.services import ai_service, inference_pool
+from app.services.analysis_retention import analysis_compactor
+from app.services.analysis_runner import analysis_runner
+from app.services.collaborative_filtering import similarity_index
+from app.services.facet_service import facet_cache
+from app.services.fx_rates import load_rates, rate_cache
+from app.services.latest_analysis import backfill_latest
+from app.services.search_history_buffer import search_history_buffer
+from app.services.user_profile import profile_cache
 
 app = FastAPI(
     title="HomeGenius API",
     description="AI-powered real estate platform API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -33,16 +38,101 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for uploaded images
-if not os.path.exists("uploads"):
-    os.makedirs("uploads")
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Opt-in request profiling; not installed at all unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Read replicas, with reads pinned to the primary right after a client wrote
+if replicas.engines:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Per-request SQL tracking, shared by the query log and the request metrics
+for instrumented_engine in [engine, *replicas.engines]:
+    query_log.instrument_engine(instrumented_engine)
+if settings.QUERY_LOG_ENABLED:
+    app.add_middleware(query_log.QueryLogMiddleware)
+
+# Request metrics, outermost so they cover the whole middleware stack
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+metrics.registry.register_stats("homegenius_user_cache", "Authenticated user cache", auth.user_cache.stats)
+metrics.registry.register_stats("homegenius_password_hashing", "Password hashing pool", password_hasher.stats)
+metrics.registry.register_stats("homegenius_facet_cache", "Search facet cache", facet_cache.stats)
+metrics.registry.register_stats("homegenius_user_profile_cache", "Compiled user profile cache", profile_cache.stats)
+metrics.registry.register_stats("homegenius_search_history", "Search history write-behind buffer", search_history_buffer.stats)
+metrics.registry.register_stats("homegenius_inference_pool", "Inference worker pool", inference_pool.stats)
+metrics.registry.register_stats("homegenius_inference_admission", "Inference concurrency cap", inference_limiter.stats)
+metrics.registry.register_stats("homegenius_analysis_dedup", "Shared and reused property analyses", analysis_runner.stats)
+metrics.registry.register_stats("homegenius_rate_limit", "Per-user rate limits", rate_limiter.stats)
+metrics.registry.register_stats("homegenius_similarity_index", "Item-item similarity index", similarity_index.stats)
+metrics.registry.register_stats("homegenius_read_replicas", "Read replica routing", replicas.stats)
+metrics.registry.register_stats("homegenius_analysis_compaction", "AI analysis history compaction", analysis_compactor.stats)
+metrics.registry.register_stats("homegenius_fx_rate_cache", "Exchange rate cache", rate_cache.stats)
+
+# Mount static files for uploaded images (the directory is created on startup)
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_PATH, check_dir=False), name="uploads")
+
+_initialized = False
+
+def initialize():
+    """Run one-time startup side effects.
+
+    Idempotent, so the pre-fork launcher can run it once in the parent process
+    and workers forked from it skip it on their own startup.
+    """
+    global _initialized
+    if _initialized:
+        return
+
+    # Create database tables (with error handling)
+    try:
+        upgrades = init_db()
+        print("Database tables created successfully")
+        for upgrade in upgrades:
+            print(f"Schema upgrade: {upgrade}")
+        backfilled = backfill_latest(engine)
+        if backfilled:
+            print(f"Backfilled {backfilled} latest-analysis pointers")
+    except Exception as e:
+        print(f"Warning: Could not create database tables: {e}")
+        print("Server will start but database features may not work")
+
+    if settings.FX_RATES_FILE:
+        try:
+            loaded = load_rates(settings.FX_RATES_FILE)
+            print(f"Loaded {loaded['rates']} exchange rates, re-priced {loaded['listings']} listings")
+        except Exception as e:
+            print(f"Warning: Could not load exchange rates from {settings.FX_RATES_FILE}: {e}")
+
+    os.makedirs(settings.UPLOAD_PATH, exist_ok=True)
+
+    if settings.AI_PRELOAD_MODELS:
+        ai_service.load_models()
+
+    _initialized = True
+
+@app.on_event("startup")
+async def on_startup():
+    initialize()
+    replicas.start()
+    similarity_index.start()
+    await search_history_buffer.start()
+    await analysis_compactor.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await analysis_compactor.stop()
+    await search_history_buffer.stop()
+    inference_pool.shutdown()
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(properties.router, prefix="/api/properties", tags=["properties"])
 app.include_router(ai_analysis.router, prefix="/api/ai", tags=["ai-analysis"])
 app.include_router(recommendations.router, prefix="/api/recommendations", tags=["recommendations"])
+if settings.PROFILING_ENABLED:
+    app.include_router(profiling.router, prefix="/api/profiling", tags=["profiling"])
 
 @app.get("/")
 async def root():
@@ -51,3 +141,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
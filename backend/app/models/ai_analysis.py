@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, utcnow
 
 class AIAnalysis(Base):
     __tablename__ = "ai_analyses"
@@ -30,10 +30,51 @@ class AIAnalysis(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     
     # Relationships
     property = relationship("Property", back_populates="ai_analyses")
+    
+    __table_args__ = (
+        # History reads per property, newest first, with or without a type filter
+        Index("ix_ai_analyses_property_type_created", "property_id", "analysis_type", "created_at"),
+        Index("ix_ai_analyses_property_created", "property_id", "created_at"),
+    )
+    # Load created_at on insert, so the latest-analysis pointer can be updated in the same flush
+    __mapper_args__ = {"eager_defaults": True}
+
+class LatestAnalysis(Base):
+    """Pointer to the newest analysis of each type for a property"""
+    __tablename__ = "latest_analyses"
+    
+    property_id = Column(Integer, ForeignKey("properties.id"), primary_key=True)
+    analysis_type = Column(String(50), primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("ai_analyses.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    
+    # Relationships
+    analysis = relationship("AIAnalysis")
+
+class AnalysisDailySummary(Base):
+    """Per-day aggregate of the analyses removed by history compaction"""
+    __tablename__ = "analysis_daily_summaries"
+    
+    property_id = Column(Integer, ForeignKey("properties.id"), primary_key=True)
+    analysis_type = Column(String(50), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    analysis_count = Column(Integer, nullable=False)
+    predicted_price_min = Column(Float)
+    predicted_price_max = Column(Float)
+    predicted_price_avg = Column(Float)
+    price_confidence_avg = Column(Float)
+    style_confidence_avg = Column(Float)
+    quality_score_avg = Column(Float)
+    processing_time_avg = Column(Float)
+    style_counts = Column(JSON)  # Top detected style -> number of analyses
+    model_versions = Column(JSON)  # Model versions seen that day
+    first_created_at = Column(DateTime(timezone=True))
+    last_created_at = Column(DateTime(timezone=True))
 
 class StyleCategory(Base):
     __tablename__ = "style_categories"
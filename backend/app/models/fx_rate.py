@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class FxRate(Base):
+    """Exchange rate of a currency against ``settings.BASE_CURRENCY``"""
+    __tablename__ = "fx_rates"
+    
+    currency = Column(String(3), primary_key=True)
+    units_per_base = Column(Float, nullable=False)  # e.g. 11.5 SEK per EUR
+    source = Column(String(255))  # File the rate was loaded from
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,21 +1,26 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.config import settings
+from app.core.database import Base, utcnow
 
 class Property(Base):
     __tablename__ = "properties"
     
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(100), unique=True, index=True)  # Listing id in the source feed
     title = Column(String(255), nullable=False)
     description = Column(Text)
     price = Column(Float, nullable=False)
+    currency = Column(String(3), nullable=False, server_default=settings.MARKET_CURRENCIES[settings.DEFAULT_MARKET])  # ISO 4217, defaults to the market's
+    price_normalized = Column(Float)  # Price in settings.BASE_CURRENCY, None while the currency has no rate
     area = Column(Float)  # Square meters
     rooms = Column(Integer)
     bedrooms = Column(Integer)
     bathrooms = Column(Integer)
     
     # Location
+    market = Column(String(2), nullable=False, default=settings.DEFAULT_MARKET, server_default=settings.DEFAULT_MARKET)  # SE, US, UK, DE, FR
     address = Column(String(500))
     city = Column(String(100))
     postal_code = Column(String(20))
@@ -36,13 +41,23 @@ class Property(Base):
     images = Column(JSON)  # List of image URLs
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow, index=True)
     is_active = Column(Boolean, default=True)
     
     # Relationships
     ai_analyses = relationship("AIAnalysis", back_populates="property")
     user_favorites = relationship("UserFavorite", back_populates="property")
+    
+    # Market-leading indexes keep each market's rows in one contiguous index
+    # range, so per-market reads cost the same however many markets we add
+    __table_args__ = (
+        Index("ix_properties_market_active_created", "market", "is_active", "created_at"),
+        Index("ix_properties_market_active_price", "market", "is_active", "price"),
+        Index("ix_properties_market_type_city", "market", "property_type", "city"),
+        # Cross-market price ranges compare normalized prices
+        Index("ix_properties_active_price_normalized", "is_active", "price_normalized"),
+    )
 
 class UserFavorite(Base):
     __tablename__ = "user_favorites"
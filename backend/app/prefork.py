@@ -0,0 +1,117 @@
+"""Pre-fork launcher for running several API workers.
+
+The parent process runs the startup side effects and loads the AI models once,
+then forks the workers. Model weights therefore live in memory pages shared
+copy-on-write by every worker instead of being loaded again per process.
+
+Usage (from the backend directory):
+
+    python -m app.prefork --workers 4 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+from typing import Set
+
+import uvicorn
+
+from app import main as app_main
+from app.core.database import engine
+from app.core.replicas import replicas
+from app.services import ai_service
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(sock: socket.socket, log_level: str):
+    """Serve requests in a forked worker until it is told to stop"""
+    # Restore default handlers; uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(app_main.app, log_level=log_level)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+def _spawn(sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            _run_worker(sock, log_level)
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+def serve(host: str, port: int, workers: int, log_level: str = "info"):
+    # Everything shared with the workers is set up before forking
+    app_main.initialize()
+    ai_service.load_models()
+
+    # Connections must not be shared across processes; each worker opens its own
+    engine.dispose()
+    replicas.dispose()
+
+    # Move the objects created so far out of the collector's reach, so garbage
+    # collection in the workers does not write to (and un-share) their pages
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind_socket(host, port)
+    children: Set[int] = set()
+    running = True
+
+    def shutdown(signum, frame):
+        nonlocal running
+        running = False
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(workers):
+        children.add(_spawn(sock, log_level))
+    print(f"Pre-fork server listening on {host}:{port} with {workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+
+        if running:
+            print(f"Worker {pid} exited with status {status}, restarting")
+            children.add(_spawn(sock, log_level))
+
+    sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("Pre-fork mode requires a platform with os.fork()")
+
+    serve(args.host, args.port, args.workers, args.log_level)
+
+if __name__ == "__main__":
+    main()
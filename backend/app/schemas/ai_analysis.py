@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 class PricePrediction(BaseModel):
     predicted_price: float
@@ -42,6 +42,29 @@ class AIAnalysisResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AIAnalysisHistory(BaseModel):
+    analyses: List[AIAnalysisResponse]
+    next_cursor: Optional[int] = None  # Pass as ``cursor`` to fetch the next (older) page
+    limit: int
+
+class AnalysisDailySummary(BaseModel):
+    property_id: int
+    analysis_type: str
+    day: date
+    analysis_count: int
+    predicted_price_min: Optional[float] = None
+    predicted_price_max: Optional[float] = None
+    predicted_price_avg: Optional[float] = None
+    price_confidence_avg: Optional[float] = None
+    style_confidence_avg: Optional[float] = None
+    quality_score_avg: Optional[float] = None
+    processing_time_avg: Optional[float] = None
+    style_counts: Optional[Dict[str, int]] = None
+    model_versions: Optional[List[str]] = None
+
+    class Config:
+        from_attributes = True
+
 class StyleCategoryCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -1,11 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from app.core.config import settings
+from app.services.markets import normalize_currency, normalize_market
 
 class PropertyBase(BaseModel):
     title: str
     description: Optional[str] = None
     price: float
+    currency: Optional[str] = None  # Defaults to the market's currency
     area: Optional[float] = None
     rooms: Optional[int] = None
     bedrooms: Optional[int] = None
@@ -13,6 +16,7 @@ class PropertyBase(BaseModel):
     address: Optional[str] = None
     city: Optional[str] = None
     postal_code: Optional[str] = None
+    market: str = settings.DEFAULT_MARKET
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     property_type: Optional[str] = None
@@ -22,6 +26,10 @@ class PropertyBase(BaseModel):
     total_floors: Optional[int] = None
     features: Optional[Dict[str, Any]] = None
     images: Optional[List[str]] = None
+    external_id: Optional[str] = None
+
+    _normalize_market = field_validator("market")(normalize_market)
+    _normalize_currency = field_validator("currency")(normalize_currency)
 
 class PropertyCreate(PropertyBase):
     pass
@@ -30,6 +38,7 @@ class PropertyUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     price: Optional[float] = None
+    currency: Optional[str] = None
     area: Optional[float] = None
     rooms: Optional[int] = None
     bedrooms: Optional[int] = None
@@ -46,21 +55,58 @@ class PropertyUpdate(BaseModel):
     total_floors: Optional[int] = None
     features: Optional[Dict[str, Any]] = None
     images: Optional[List[str]] = None
+    external_id: Optional[str] = None
+    market: Optional[str] = None
     is_active: Optional[bool] = None
 
+    _normalize_market = field_validator("market")(normalize_market)
+    _normalize_currency = field_validator("currency")(normalize_currency)
+
 class Property(PropertyBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     is_active: bool
+    price_normalized: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class PropertySummary(BaseModel):
+    id: int
+    title: str
+    price: float
+    currency: Optional[str] = None
+    area: Optional[float] = None
+    rooms: Optional[int] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    market: Optional[str] = None
+    property_type: Optional[str] = None
+    condition: Optional[str] = None
+    thumbnail: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class IngestionError(BaseModel):
+    row: int
+    error: str
+
+class IngestionReport(BaseModel):
+    processed: int
+    upserted: int
+    failed: int
+    errors: List[IngestionError]
+    errors_truncated: bool = False
+
 class PropertySearch(BaseModel):
     query: Optional[str] = None
     min_price: Optional[float] = None
     max_price: Optional[float] = None
+    currency: Optional[str] = None  # Price bounds in this currency match listings in any currency
     min_area: Optional[float] = None
     max_area: Optional[float] = None
     rooms: Optional[int] = None
@@ -69,13 +115,21 @@ class PropertySearch(BaseModel):
     property_type: Optional[str] = None
     city: Optional[str] = None
     postal_code: Optional[str] = None
+    market: Optional[str] = None
     features: Optional[List[str]] = None
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=20, ge=1, le=100)
 
+class FacetCount(BaseModel):
+    value: Optional[Any] = None  # Term facets (city, property_type, rooms)
+    min: Optional[float] = None  # Range facets (price, area)
+    max: Optional[float] = None
+    count: int
+
 class PropertyResponse(BaseModel):
-    properties: List[Property]
+    properties: List[PropertySummary]
     total: int
     page: int
     limit: int
     total_pages: int
+    facets: Optional[Dict[str, List[FacetCount]]] = None
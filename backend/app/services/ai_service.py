@@ -1,37 +1,131 @@
-import torch
-import torchvision.transforms as transforms
-from PIL import Image
-import numpy as np
+import asyncio
+import io
 import json
+import threading
 import time
 from typing import Dict, List, Any, Optional
 from sqlalchemy.orm import Session
 from app.models.property import Property
 from app.core.config import settings
+from app.core.metrics import registry
+from app.services import inference_pool
+
+INFERENCE_SECONDS = registry.histogram(
+    "homegenius_ai_inference_seconds", "AI analysis processing time", ["analysis"]
+)
+
+# The ML stack (torch, torchvision, PIL) is imported on first inference, or on
+# an explicit warm-up, rather than at module load so that workers which never
+# run inference do not pay for it at startup.
+_models: Optional[Dict[str, Any]] = None
+_models_lock = threading.Lock()
+
+def load_models() -> Dict[str, Any]:
+    """Import the ML stack and load pre-trained models (idempotent)"""
+    global _models
+    if _models is not None:
+        return _models
+
+    with _models_lock:
+        if _models is None:
+            import torch
+
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+            # Placeholder for model loading
+            # In a real implementation, you would load your trained models
+            # from settings.MODEL_PATH here
+            _models = {
+                "device": device,
+                "price_model": None,
+                "style_model": None,
+                "image_processor": None,
+            }
+
+            # For now, we'll use mock models
+            print("AI Service initialized with mock models")
+    return _models
+
+def models_loaded() -> bool:
+    return _models is not None
+
+IMAGE_SIZE = (224, 224)
+IMAGE_MEAN = (0.485, 0.456, 0.406)
+IMAGE_STD = (0.229, 0.224, 0.225)
+
+def preprocess_image(image_data: bytes):
+    """Decode an image into a normalized float32 CHW array"""
+    import numpy as np
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_data))
+    image = image.convert("RGB").resize(IMAGE_SIZE)
+
+    array = np.asarray(image, dtype=np.float32) / 255.0
+    array = (array - np.array(IMAGE_MEAN, dtype=np.float32)) / np.array(IMAGE_STD, dtype=np.float32)
+    return np.ascontiguousarray(array.transpose(2, 0, 1))
+
+def run_image_inference(image, analysis_type: str = "style") -> Dict[str, Any]:
+    """Run the image models on a preprocessed CHW array.
+
+    Used both in the API process and inside the inference worker processes,
+    where ``image`` is a view over a shared memory block.
+    """
+    load_models()
+
+    # Mock image analysis
+    # In a real implementation, you would wrap the array with
+    # torch.from_numpy (no copy) and run your computer vision model
+    detected_styles = [
+        {"style": "contemporary", "confidence": 0.88},
+        {"style": "industrial", "confidence": 0.65}
+    ]
+    
+    features = {
+        "dominant_colors": ["#2c3e50", "#ecf0f1", "#e74c3c"],
+        "texture_analysis": "smooth_surfaces",
+        "lighting_quality": "high",
+        "composition": "balanced"
+    }
+    
+    quality_score = 0.85  # Mock quality assessment
+    
+    return {
+        "detected_styles": detected_styles,
+        "style_confidence": 0.88,
+        "features": features,
+        "image_analysis": {
+            "quality_score": quality_score,
+            "dominant_colors": features["dominant_colors"],
+            "texture_analysis": features["texture_analysis"]
+        },
+        "quality_score": quality_score
+    }
 
 class AIService:
     def __init__(self):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model_path = settings.MODEL_PATH
-        self._load_models()
-    
+
+    @property
+    def device(self):
+        return load_models()["device"]
+
     def _load_models(self):
-        """Load pre-trained models"""
-        # Placeholder for model loading
-        # In a real implementation, you would load your trained models here
-        self.price_model = None
-        self.style_model = None
-        self.image_processor = None
-        
-        # For now, we'll use mock models
-        print("AI Service initialized with mock models")
+        """Load pre-trained models on first use"""
+        models = load_models()
+        self.price_model = models["price_model"]
+        self.style_model = models["style_model"]
+        self.image_processor = models["image_processor"]
     
     async def predict_price(self, property_id: int, db: Session) -> Dict[str, Any]:
         """Predict property price based on features"""
+        start_time = time.time()
         property = db.query(Property).filter(Property.id == property_id).first()
         if not property:
             raise ValueError(f"Property {property_id} not found")
         
+        self._load_models()
+        
         # Mock price prediction logic
         # In a real implementation, you would use your trained model
         base_price = property.price or 1000000  # Use actual price as base
@@ -47,18 +141,25 @@ class AIService:
         predicted_price = sum(price_factors.values())
         confidence = 0.75  # Mock confidence score
         
+        processing_time = time.time() - start_time
+        INFERENCE_SECONDS.observe(processing_time, analysis="price")
+        
         return {
             "predicted_price": predicted_price,
             "confidence": confidence,
-            "factors": price_factors
+            "factors": price_factors,
+            "processing_time": processing_time
         }
     
     async def analyze_style(self, property_id: int, db: Session) -> Dict[str, Any]:
         """Analyze property style from images"""
+        start_time = time.time()
         property = db.query(Property).filter(Property.id == property_id).first()
         if not property:
             raise ValueError(f"Property {property_id} not found")
         
+        self._load_models()
+        
         # Mock style analysis
         # In a real implementation, you would analyze the property images
         detected_styles = [
@@ -74,10 +175,14 @@ class AIService:
             "lighting": "natural"
         }
         
+        processing_time = time.time() - start_time
+        INFERENCE_SECONDS.observe(processing_time, analysis="style")
+        
         return {
             "detected_styles": detected_styles,
             "confidence": 0.80,
-            "features": features
+            "features": features,
+            "processing_time": processing_time
         }
     
     async def analyze_image(self, image_data: bytes, analysis_type: str = "style") -> Dict[str, Any]:
@@ -85,40 +190,19 @@ class AIService:
         start_time = time.time()
         
         try:
-            # Load and preprocess image
-            image = Image.open(io.BytesIO(image_data))
-            image = image.convert("RGB")
-            
-            # Mock image analysis
-            # In a real implementation, you would use your computer vision model
-            detected_styles = [
-                {"style": "contemporary", "confidence": 0.88},
-                {"style": "industrial", "confidence": 0.65}
-            ]
-            
-            features = {
-                "dominant_colors": ["#2c3e50", "#ecf0f1", "#e74c3c"],
-                "texture_analysis": "smooth_surfaces",
-                "lighting_quality": "high",
-                "composition": "balanced"
-            }
+            if settings.INFERENCE_WORKERS > 0:
+                # Decode off the event loop, then hand the tensor to the
+                # inference pool through shared memory
+                loop = asyncio.get_running_loop()
+                image = await loop.run_in_executor(None, preprocess_image, image_data)
+                result = await inference_pool.run_inference(image, analysis_type)
+            else:
+                image = preprocess_image(image_data)
+                result = run_image_inference(image, analysis_type)
             
-            quality_score = 0.85  # Mock quality assessment
-            
-            processing_time = time.time() - start_time
-            
-            return {
-                "detected_styles": detected_styles,
-                "style_confidence": 0.88,
-                "features": features,
-                "image_analysis": {
-                    "quality_score": quality_score,
-                    "dominant_colors": features["dominant_colors"],
-                    "texture_analysis": features["texture_analysis"]
-                },
-                "quality_score": quality_score,
-                "processing_time": processing_time
-            }
+            result["processing_time"] = time.time() - start_time
+            INFERENCE_SECONDS.observe(result["processing_time"], analysis=f"image_{analysis_type}")
+            return result
             
         except Exception as e:
             raise ValueError(f"Image analysis failed: {str(e)}")
@@ -168,6 +252,3 @@ class AIService:
             "model_version": "1.1.0",
             "training_samples": len(training_data)
         }
-
-# Import io for image processing
-import io
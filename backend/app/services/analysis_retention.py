@@ -0,0 +1,331 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+from app.core.database import engine as default_engine
+from app.models.ai_analysis import AIAnalysis, AnalysisDailySummary, LatestAnalysis
+
+SummaryKey = Tuple[int, str, date]
+
+# Averaged columns of the summary and the analysis column each one is taken from
+AVERAGED_FIELDS = {
+    "predicted_price_avg": "predicted_price",
+    "price_confidence_avg": "price_confidence",
+    "style_confidence_avg": "style_confidence",
+    "quality_score_avg": "quality_score",
+    "processing_time_avg": "processing_time",
+}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _utc_day(value: datetime) -> date:
+    # SQLite returns naive timestamps, which are stored in UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+def _top_style(detected_styles) -> Optional[str]:
+    if not detected_styles:
+        return None
+    best = max(detected_styles, key=lambda style: style.get("confidence") or 0)
+    return best.get("style")
+
+class _DaySummary:
+    """Running aggregate for one (property, type, day), mergeable with a stored summary"""
+
+    def __init__(self):
+        self.count = 0
+        self.price_min: Optional[float] = None
+        self.price_max: Optional[float] = None
+        self.sums = {field: 0.0 for field in AVERAGED_FIELDS}
+        self.counts = {field: 0 for field in AVERAGED_FIELDS}
+        self.styles: Counter = Counter()
+        self.model_versions = set()
+        self.first_created_at: Optional[datetime] = None
+        self.last_created_at: Optional[datetime] = None
+
+    def _span(self, first: Optional[datetime], last: Optional[datetime]):
+        if first is not None and (self.first_created_at is None or first < self.first_created_at):
+            self.first_created_at = first
+        if last is not None and (self.last_created_at is None or last > self.last_created_at):
+            self.last_created_at = last
+
+    def _price(self, low: Optional[float], high: Optional[float]):
+        if low is not None and (self.price_min is None or low < self.price_min):
+            self.price_min = low
+        if high is not None and (self.price_max is None or high > self.price_max):
+            self.price_max = high
+
+    def add(self, row):
+        self.count += 1
+        self._price(row.predicted_price, row.predicted_price)
+        for field, column in AVERAGED_FIELDS.items():
+            value = getattr(row, column)
+            if value is not None:
+                self.sums[field] += value
+                self.counts[field] += 1
+        style = _top_style(row.detected_styles)
+        if style:
+            self.styles[style] += 1
+        if row.model_version:
+            self.model_versions.add(row.model_version)
+        self._span(row.created_at, row.created_at)
+
+    def merge_stored(self, summary):
+        # Analyses of one type fill the same columns, so stored averages are
+        # weighted by the analysis count
+        self.count += summary.analysis_count
+        self._price(summary.predicted_price_min, summary.predicted_price_max)
+        for field in AVERAGED_FIELDS:
+            value = getattr(summary, field)
+            if value is not None:
+                self.sums[field] += value * summary.analysis_count
+                self.counts[field] += summary.analysis_count
+        self.styles.update(summary.style_counts or {})
+        self.model_versions.update(summary.model_versions or [])
+        self._span(summary.first_created_at, summary.last_created_at)
+
+    def values(self) -> Dict[str, Any]:
+        return {
+            "analysis_count": self.count,
+            "predicted_price_min": self.price_min,
+            "predicted_price_max": self.price_max,
+            **{
+                field: self.sums[field] / self.counts[field] if self.counts[field] else None
+                for field in AVERAGED_FIELDS
+            },
+            "style_counts": dict(self.styles),
+            "model_versions": sorted(self.model_versions),
+            "first_created_at": self.first_created_at,
+            "last_created_at": self.last_created_at,
+        }
+
+class AnalysisCompactor:
+    """Retention for the ``ai_analyses`` history.
+
+    For every (property, analysis type) the newest ``keep_latest`` analyses are
+    kept in full, as is everything younger than ``min_age_days``. Older
+    analyses are deleted in batches of ``batch_size``, each in its own
+    transaction, and folded into ``analysis_daily_summaries``. With an
+    ``archive_dir`` the deleted rows are also appended to a gzipped NDJSON
+    file per run before the batch commits.
+
+    The newest analysis of each type is always kept, so the latest-analysis
+    pointers stay valid. Deleted rows are taken from ``DELETE ... RETURNING``,
+    so compaction running in several processes never summarizes a row twice.
+    """
+
+    def __init__(
+        self,
+        keep_latest: int,
+        min_age_days: int,
+        batch_size: int,
+        archive_dir: str = "",
+        interval: float = 0
+    ):
+        if keep_latest < 1:
+            raise ValueError("keep_latest must be at least 1 to keep the latest analysis of each type")
+        self.keep_latest = keep_latest
+        self.min_age_days = min_age_days
+        self.batch_size = batch_size
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self._running = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.failures = 0
+        self.deleted = 0
+        self.archived = 0
+        self.last_run_seconds = 0.0
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(days=self.min_age_days)
+
+    def _property_chunks(self, connection) -> Iterable[Tuple[int, int]]:
+        """Consecutive (after, up_to) property id ranges with at most ``batch_size`` properties each"""
+        after = 0
+        while True:
+            property_ids = select(AIAnalysis.property_id).where(
+                AIAnalysis.property_id > after
+            ).distinct().order_by(AIAnalysis.property_id).limit(self.batch_size).subquery()
+            up_to = connection.execute(select(func.max(property_ids.c.property_id))).scalar()
+            if up_to is None:
+                return
+            yield after, up_to
+            after = up_to
+
+    def _candidates(self, after: int, up_to: int, cutoff: datetime):
+        ranked = select(
+            AIAnalysis.id,
+            AIAnalysis.created_at,
+            func.row_number().over(
+                partition_by=(AIAnalysis.property_id, AIAnalysis.analysis_type),
+                order_by=(AIAnalysis.created_at.desc(), AIAnalysis.id.desc()),
+            ).label("position"),
+        ).where(
+            AIAnalysis.property_id > after,
+            AIAnalysis.property_id <= up_to,
+            AIAnalysis.analysis_type.isnot(None),
+        ).subquery()
+        return select(ranked.c.id).where(
+            ranked.c.position > self.keep_latest,
+            ranked.c.created_at < cutoff,
+            ~exists().where(LatestAnalysis.analysis_id == ranked.c.id),
+        )
+
+    def _delete(self, connection, ids: List[int]) -> List[Any]:
+        columns = list(AIAnalysis.__table__.columns)
+        stmt = delete(AIAnalysis).where(AIAnalysis.id.in_(ids))
+        if connection.dialect.delete_returning:
+            return connection.execute(stmt.returning(*columns)).all()
+        rows = connection.execute(select(*columns).where(AIAnalysis.id.in_(ids))).all()
+        connection.execute(stmt)
+        return rows
+
+    def _summarize(self, connection, rows: List[Any]) -> int:
+        summaries: Dict[SummaryKey, _DaySummary] = {}
+        for row in rows:
+            key = (row.property_id, row.analysis_type, _utc_day(row.created_at))
+            summaries.setdefault(key, _DaySummary()).add(row)
+
+        # Locked, so concurrent compactions cannot lose each other's counts
+        stored = connection.execute(
+            select(AnalysisDailySummary).where(
+                AnalysisDailySummary.property_id.in_({key[0] for key in summaries}),
+                AnalysisDailySummary.day.in_({key[2] for key in summaries}),
+            ).with_for_update()
+        ).all()
+        existing = set()
+        for summary in stored:
+            key = (summary.property_id, summary.analysis_type, summary.day)
+            if key in summaries:
+                summaries[key].merge_stored(summary)
+                existing.add(key)
+
+        for (property_id, analysis_type, day), summary in summaries.items():
+            values = summary.values()
+            if (property_id, analysis_type, day) in existing:
+                connection.execute(update(AnalysisDailySummary).where(
+                    AnalysisDailySummary.property_id == property_id,
+                    AnalysisDailySummary.analysis_type == analysis_type,
+                    AnalysisDailySummary.day == day,
+                ).values(**values))
+            else:
+                connection.execute(insert(AnalysisDailySummary).values(
+                    property_id=property_id, analysis_type=analysis_type, day=day, **values
+                ))
+        return len(summaries)
+
+    def _archive(self, path: str, rows: List[Any]):
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(dict(row._mapping), default=_json_default, ensure_ascii=False))
+                f.write("\n")
+
+    def compact(self, engine=None, dry_run: bool = False) -> Dict[str, Any]:
+        """Apply the retention policy once and return what was (or, with ``dry_run``, would be) removed"""
+        engine = engine or default_engine
+        report = {"deleted": 0, "summaries": 0, "batches": 0, "archive": None, "dry_run": dry_run}
+        if not self._running.acquire(blocking=False):
+            raise ValueError("Compaction is already running")
+
+        started_at = time.perf_counter()
+        cutoff = self._cutoff()
+        archive_path = None
+        if self.archive_dir and not dry_run:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            archive_path = os.path.join(
+                self.archive_dir, f"ai_analyses-{datetime.utcnow():%Y%m%dT%H%M%S}.ndjson.gz"
+            )
+
+        try:
+            with engine.connect() as reader:
+                chunks = list(self._property_chunks(reader))
+
+            for after, up_to in chunks:
+                candidates = self._candidates(after, up_to, cutoff)
+                if dry_run:
+                    with engine.connect() as connection:
+                        report["deleted"] += connection.execute(
+                            select(func.count()).select_from(candidates.subquery())
+                        ).scalar()
+                    continue
+
+                while True:
+                    with engine.begin() as connection:
+                        ids = connection.execute(candidates.order_by("id").limit(self.batch_size)).scalars().all()
+                        if not ids:
+                            break
+                        rows = self._delete(connection, ids)
+                        if not rows:
+                            break
+                        # Archived before the batch commits: a failed commit may leave
+                        # duplicates in the archive, but never loses an analysis
+                        if archive_path:
+                            self._archive(archive_path, rows)
+                            self.archived += len(rows)
+                            report["archive"] = archive_path
+                        report["summaries"] += self._summarize(connection, rows)
+                    report["deleted"] += len(rows)
+                    report["batches"] += 1
+                    self.deleted += len(rows)
+        finally:
+            self._running.release()
+            self.runs += 1
+            self.last_run_seconds = time.perf_counter() - started_at
+
+        report["seconds"] = round(self.last_run_seconds, 3)
+        return report
+
+    async def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                report = await asyncio.to_thread(self.compact)
+                if report["deleted"]:
+                    print(f"Compacted {report['deleted']} AI analyses into {report['summaries']} daily summaries")
+            except (SQLAlchemyError, OSError, ValueError) as e:
+                self.failures += 1
+                print(f"Warning: AI analysis compaction failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "deleted": self.deleted,
+            "archived": self.archived,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+analysis_compactor = AnalysisCompactor(
+    keep_latest=settings.ANALYSIS_RETENTION_KEEP_LATEST,
+    min_age_days=settings.ANALYSIS_RETENTION_MIN_AGE_DAYS,
+    batch_size=settings.ANALYSIS_COMPACTION_BATCH_SIZE,
+    archive_dir=settings.ANALYSIS_ARCHIVE_DIR,
+    interval=settings.ANALYSIS_COMPACTION_INTERVAL_SECONDS,
+)
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.rate_limit import inference_limiter
+from app.core.singleflight import SingleFlight
+from app.models.ai_analysis import AIAnalysis
+from app.schemas.ai_analysis import AIAnalysisResponse
+from app.services.ai_service import AIService
+from app.services.latest_analysis import get_latest
+
+MODEL_VERSION = "1.0.0"
+
+class AnalysisRunner:
+    """Runs property analyses without repeating identical work.
+
+    A stored analysis of the same type and model version younger than
+    ``freshness_seconds`` is returned as is, unless it came from an uploaded
+    image (``image_analysis`` is set) rather than from the property itself. Otherwise concurrent requests for
+    the same (property, type, model version) share one computation, which
+    holds a single inference slot and inserts a single analysis.
+    """
+
+    def __init__(self, freshness_seconds: float):
+        self.freshness_seconds = freshness_seconds
+        self._flights = SingleFlight()
+        self.fresh_hits = 0
+
+    def _fresh(self, analysis: AIAnalysis) -> bool:
+        created_at = analysis.created_at
+        # SQLite returns naive timestamps, which are stored in UTC
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - created_at <= timedelta(seconds=self.freshness_seconds)
+
+    def _fresh_analysis(self, property_id: int, analysis_type: str) -> Optional[AIAnalysisResponse]:
+        # A short-lived session: callers waiting on a shared computation hold no connection
+        with SessionLocal() as db:
+            for analysis in get_latest(db, property_id, [analysis_type]):
+                # analyze-image stores "style" rows too; those describe an upload, not the listing
+                if analysis.image_analysis is not None:
+                    continue
+                if analysis.model_version == MODEL_VERSION and self._fresh(analysis):
+                    return AIAnalysisResponse.model_validate(analysis)
+        return None
+
+    async def analyze(self, property_id: int, analysis_type: str) -> AIAnalysisResponse:
+        if self.freshness_seconds > 0:
+            fresh = self._fresh_analysis(property_id, analysis_type)
+            if fresh is not None:
+                self.fresh_hits += 1
+                return fresh
+
+        return await self._flights.do(
+            (property_id, analysis_type, MODEL_VERSION),
+            lambda: self._compute(property_id, analysis_type),
+        )
+
+    async def _compute(self, property_id: int, analysis_type: str) -> AIAnalysisResponse:
+        # The computation outlives a caller that disconnects, so it uses its own session
+        ai_service = AIService()
+        db = SessionLocal()
+        try:
+            async with inference_limiter.slot():
+                price_analysis = None
+                style_analysis = None
+                if analysis_type in ["price", "combined"]:
+                    price_analysis = await ai_service.predict_price(property_id, db)
+                if analysis_type in ["style", "combined"]:
+                    style_analysis = await ai_service.analyze_style(property_id, db)
+
+            # Create analysis record
+            analysis_data = {
+                "property_id": property_id,
+                "analysis_type": analysis_type,
+                "model_version": MODEL_VERSION,
+                "processing_time": sum(
+                    analysis["processing_time"] for analysis in (price_analysis, style_analysis) if analysis
+                )
+            }
+
+            if price_analysis:
+                analysis_data.update({
+                    "predicted_price": price_analysis["predicted_price"],
+                    "price_confidence": price_analysis["confidence"],
+                    "price_factors": price_analysis["factors"]
+                })
+
+            if style_analysis:
+                analysis_data.update({
+                    "detected_styles": style_analysis["detected_styles"],
+                    "style_confidence": style_analysis["confidence"],
+                    "style_features": style_analysis["features"]
+                })
+
+            db_analysis = AIAnalysis(**analysis_data)
+            db.add(db_analysis)
+            db.commit()
+            db.refresh(db_analysis)
+            return AIAnalysisResponse.model_validate(db_analysis)
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._flights.stats(), "fresh_hits": self.fresh_hits}
+
+analysis_runner = AnalysisRunner(settings.ANALYSIS_FRESHNESS_SECONDS)
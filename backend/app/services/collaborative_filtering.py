@@ -0,0 +1,208 @@
+import heapq
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.models.property import UserFavorite
+
+class ItemSimilarityIndex:
+    """Item-item neighbour lists built from ``user_favorites``.
+
+    Each item keeps its ``neighbors`` most cosine-similar items with their
+    co-occurrence counts (``item -> {other_item: co_count}``), so memory grows
+    with items x neighbors rather than with every co-favorited pair. A user's
+    candidates are the summed similarities of their favorites' neighbours.
+
+    Each process builds the lists in a background thread, at startup and then
+    every ``refresh_interval`` seconds to pick up writes made by other
+    processes; requests never wait for a build. Favorites committed through
+    the ORM are applied incrementally in between. Those committed while a
+    rebuild reads the table are recorded and replayed onto the new lists when
+    they are swapped in. An incremental change can add a pair that was cut
+    from a list, counted from that change only, until the next rebuild.
+    """
+
+    def __init__(self, refresh_interval: float, neighbors: int):
+        self.refresh_interval = refresh_interval
+        self.neighbors = neighbors
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._pid: Optional[int] = None
+        # Changes committed while a rebuild runs; None when none is running
+        self._pending: Optional[List[Tuple[bool, int, int]]] = None
+        self.loaded_at: Optional[float] = None
+        self._user_items: Dict[int, Set[int]] = defaultdict(set)
+        self._item_counts: Dict[int, int] = defaultdict(int)
+        self._neighbors: Dict[int, Dict[int, int]] = defaultdict(dict)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def start(self):
+        """Start this process's build thread"""
+        # Threads do not survive the pre-fork launcher, so each process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="cf-rebuild", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"Warning: Could not rebuild the item similarity index: {e}")
+            time.sleep(self.refresh_interval)
+
+    def rebuild(self):
+        """Rebuild the neighbour lists from the database and swap them in"""
+        with self._rebuild_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                user_items: Dict[int, Set[int]] = defaultdict(set)
+                item_users: Dict[int, Set[int]] = defaultdict(set)
+                db = ReadSessionLocal()
+                try:
+                    rows = db.query(UserFavorite.user_id, UserFavorite.property_id).yield_per(10000)
+                    for user_id, property_id in rows:
+                        user_items[user_id].add(property_id)
+                        item_users[property_id].add(user_id)
+                finally:
+                    db.close()
+
+                item_counts: Dict[int, int] = defaultdict(int, {item: len(users) for item, users in item_users.items()})
+                neighbors: Dict[int, Dict[int, int]] = defaultdict(dict)
+                # One full co-occurrence row exists at a time
+                for item_id, users in item_users.items():
+                    co_counts = Counter(other for user_id in users for other in user_items[user_id])
+                    del co_counts[item_id]
+                    neighbors[item_id] = dict(heapq.nlargest(
+                        self.neighbors,
+                        co_counts.items(),
+                        key=lambda entry: entry[1] / math.sqrt(item_counts[entry[0]])
+                    ))
+
+                with self._lock:
+                    self._user_items = user_items
+                    self._item_counts = item_counts
+                    self._neighbors = neighbors
+                    # Changes already in the snapshot are no-ops when replayed
+                    for added, user_id, item_id in self._pending:
+                        (self._add if added else self._remove)(user_id, item_id)
+                    self.loaded_at = time.monotonic()
+            finally:
+                with self._lock:
+                    self._pending = None
+
+    def _add(self, user_id: int, item_id: int):
+        items = self._user_items[user_id]
+        if item_id in items:
+            return
+        for other in items:
+            for a, b in ((item_id, other), (other, item_id)):
+                row = self._neighbors[a]
+                row[b] = row.get(b, 0) + 1
+        items.add(item_id)
+        self._item_counts[item_id] += 1
+
+    def _remove(self, user_id: int, item_id: int):
+        items = self._user_items.get(user_id)
+        if not items or item_id not in items:
+            return
+        items.discard(item_id)
+        for other in items:
+            for a, b in ((item_id, other), (other, item_id)):
+                row = self._neighbors.get(a, {})
+                if b in row:
+                    row[b] -= 1
+                    if row[b] <= 0:
+                        del row[b]
+        self._item_counts[item_id] -= 1
+        if self._item_counts[item_id] <= 0:
+            del self._item_counts[item_id]
+
+    def _apply(self, added: bool, user_id: int, item_id: int):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((added, user_id, item_id))
+            if self.loaded:
+                (self._add if added else self._remove)(user_id, item_id)
+
+    def add_favorite(self, user_id: int, item_id: int):
+        self._apply(True, user_id, item_id)
+
+    def remove_favorite(self, user_id: int, item_id: int):
+        self._apply(False, user_id, item_id)
+
+    def user_items(self, user_id: int) -> Set[int]:
+        with self._lock:
+            return set(self._user_items.get(user_id, ()))
+
+    def recommend(self, item_ids: Iterable[int], limit: int, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top items by summed cosine similarity to ``item_ids``"""
+        scores: Dict[int, float] = defaultdict(float)
+        with self._lock:
+            for item_id in item_ids:
+                item_count = self._item_counts.get(item_id)
+                if not item_count:
+                    continue
+                for other, co_count in self._neighbors.get(item_id, {}).items():
+                    other_count = self._item_counts.get(other)
+                    if other_count:
+                        scores[other] += co_count / math.sqrt(item_count * other_count)
+
+        excluded = set(exclude) | set(item_ids)
+        return heapq.nlargest(
+            limit,
+            ((item, score) for item, score in scores.items() if item not in excluded),
+            key=lambda entry: entry[1]
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._user_items),
+                "items": len(self._item_counts),
+                "neighbors": sum(len(row) for row in self._neighbors.values()),
+                "loaded": self.loaded,
+            }
+
+similarity_index = ItemSimilarityIndex(refresh_interval=settings.CF_REFRESH_SECONDS, neighbors=settings.CF_NEIGHBORS)
+
+# Keep the loaded index in step with favorites committed through the ORM
+
+@event.listens_for(Session, "after_flush")
+def _collect_favorite_changes(session, flush_context):
+    changes = session.info.setdefault("favorite_changes", [])
+    for obj in session.new:
+        if isinstance(obj, UserFavorite):
+            changes.append((True, obj.user_id, obj.property_id))
+    for obj in session.deleted:
+        if isinstance(obj, UserFavorite):
+            changes.append((False, obj.user_id, obj.property_id))
+
+@event.listens_for(Session, "after_commit")
+def _apply_favorite_changes(session):
+    changes = session.info.pop("favorite_changes", None)
+    if not changes:
+        return
+    for added, user_id, property_id in changes:
+        if added:
+            similarity_index.add_favorite(user_id, property_id)
+        else:
+            similarity_index.remove_favorite(user_id, property_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_favorite_changes(session):
+    session.info.pop("favorite_changes", None)
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.models.property import Property
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+EXPORT_COLUMNS = [
+    Property.id, Property.external_id, Property.title, Property.description,
+    Property.price, Property.currency, Property.price_normalized, Property.area, Property.rooms, Property.bedrooms, Property.bathrooms,
+    Property.address, Property.city, Property.postal_code, Property.market, Property.latitude, Property.longitude,
+    Property.property_type, Property.condition, Property.year_built, Property.floor,
+    Property.total_floors, Property.features, Property.images,
+    Property.created_at, Property.updated_at, Property.is_active,
+]
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# Columns serialized as JSON documents in CSV and Parquet output
+JSON_FIELDS = ("features", "images")
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class _ChunkSink:
+    """Write-only file object collecting what the Parquet writer produces"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ExportService:
+    """Streams filtered listings from a server-side cursor in constant memory"""
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    def _batches(self, apply_filters) -> Iterator[List[Dict[str, Any]]]:
+        # The export owns its session: the response body is produced after the
+        # endpoint (and its request-scoped session) has returned
+        db = ReadSessionLocal()
+        try:
+            stmt = apply_filters(select(*EXPORT_COLUMNS).filter(Property.is_active == True))
+            stmt = stmt.order_by(Property.id).execution_options(yield_per=self.batch_size)
+            for partition in db.execute(stmt).partitions():
+                yield [row._asdict() for row in partition]
+        finally:
+            db.close()
+
+    def stream(self, apply_filters, export_format: str) -> Iterator[bytes]:
+        if export_format == "csv":
+            return self._stream_csv(apply_filters)
+        if export_format == "parquet":
+            return self._stream_parquet(apply_filters)
+        return self._stream_ndjson(apply_filters)
+
+    def _stream_ndjson(self, apply_filters) -> Iterator[bytes]:
+        for rows in self._batches(apply_filters):
+            yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode("utf-8")
+
+    def _stream_csv(self, apply_filters) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+
+        for rows in self._batches(apply_filters):
+            for row in rows:
+                writer.writerow([
+                    json.dumps(row[field]) if field in JSON_FIELDS and row[field] is not None
+                    else row[field].isoformat() if isinstance(row[field], datetime)
+                    else row[field]
+                    for field in EXPORT_FIELDS
+                ])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def _stream_parquet(self, apply_filters) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.int64()), ("external_id", pa.string()), ("title", pa.string()),
+            ("description", pa.string()), ("price", pa.float64()), ("currency", pa.string()),
+            ("price_normalized", pa.float64()), ("area", pa.float64()),
+            ("rooms", pa.int64()), ("bedrooms", pa.int64()), ("bathrooms", pa.int64()),
+            ("address", pa.string()), ("city", pa.string()), ("postal_code", pa.string()),
+            ("market", pa.string()), ("latitude", pa.float64()), ("longitude", pa.float64()),
+            ("property_type", pa.string()), ("condition", pa.string()),
+            ("year_built", pa.int64()), ("floor", pa.int64()), ("total_floors", pa.int64()),
+            ("features", pa.string()), ("images", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")), ("updated_at", pa.timestamp("us", tz="UTC")),
+            ("is_active", pa.bool_()),
+        ])
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            # One row group per batch, flushed to the client as it is written
+            for rows in self._batches(apply_filters):
+                for row in rows:
+                    for field in JSON_FIELDS:
+                        if row[field] is not None:
+                            row[field] = json.dumps(row[field])
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
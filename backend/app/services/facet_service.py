@@ -0,0 +1,93 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import Integer, String, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.property import Property
+from app.schemas.property import PropertySearch
+from app.services.fx_rates import get_rates
+
+TERM_FACETS = ("city", "property_type", "rooms")
+RANGE_FACETS = ("price", "area")
+
+# Facets of hot searches, keyed by the normalized filters
+facet_cache = TTLCache(maxsize=settings.FACET_CACHE_SIZE, ttl=settings.FACET_CACHE_TTL_SECONDS)
+
+class FacetService:
+    """Computes facet counts for a search in a single database round trip.
+
+    The filtered rows are defined once as a CTE and every facet is a GROUP BY
+    over it, combined with UNION ALL into one statement.
+    """
+
+    def __init__(self):
+        self.bucket_sizes = {
+            "price": settings.FACET_PRICE_BUCKET_SIZE,
+            "area": settings.FACET_AREA_BUCKET_SIZE,
+        }
+
+    def get_facets(
+        self,
+        db: Session,
+        filters: PropertySearch,
+        apply_filters: Callable
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        cache_key = json.dumps(filters.model_dump(exclude={"page", "limit"}), sort_keys=True, default=str)
+        facets = facet_cache.get(cache_key)
+        if facets is None:
+            facets = self._compute(db, apply_filters, filters.currency)
+            facet_cache.set(cache_key, facets)
+        return facets
+
+    def _bucket(self, db: Session, column, size: float):
+        if db.get_bind().dialect.name == "sqlite":
+            # Casting truncates in SQLite, which equals floor for non-negative values
+            return cast(column / size, Integer)
+        return func.floor(column / size)
+
+    def _compute(
+        self,
+        db: Session,
+        apply_filters: Callable,
+        currency: Optional[str] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        price = Property.price
+        if currency:
+            # A currency filter compares normalized prices, so buckets are normalized prices in that currency
+            price = Property.price_normalized * get_rates()[currency]
+        filtered = apply_filters(
+            select(
+                Property.city,
+                Property.property_type,
+                Property.rooms,
+                self._bucket(db, price, self.bucket_sizes["price"]).label("price"),
+                self._bucket(db, Property.area, self.bucket_sizes["area"]).label("area"),
+            ).filter(Property.is_active == True)
+        ).cte("filtered")
+
+        stmt = union_all(*[
+            select(
+                literal(name).label("facet"),
+                cast(filtered.c[name], String).label("value"),
+                func.count().label("count"),
+            ).where(filtered.c[name].isnot(None)).group_by(filtered.c[name])
+            for name in TERM_FACETS + RANGE_FACETS
+        ])
+
+        facets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TERM_FACETS + RANGE_FACETS}
+        for facet, value, count in db.execute(stmt):
+            if facet in RANGE_FACETS:
+                size = self.bucket_sizes[facet]
+                bucket = int(float(value))
+                facets[facet].append({"min": bucket * size, "max": (bucket + 1) * size, "count": count})
+            elif facet == "rooms":
+                facets[facet].append({"value": int(float(value)), "count": count})
+            else:
+                facets[facet].append({"value": value, "count": count})
+
+        for name in TERM_FACETS:
+            facets[name].sort(key=lambda item: item["count"], reverse=True)
+        for name in RANGE_FACETS:
+            facets[name].sort(key=lambda item: item["min"])
+        return facets
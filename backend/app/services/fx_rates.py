@@ -0,0 +1,120 @@
+"""Exchange rates and currency-normalized listing prices.
+
+Every listing stores ``price_normalized``, its price in ``BASE_CURRENCY``,
+so price ranges across markets are plain range scans on one indexed column.
+It is kept up to date by ORM hooks on ``Property``, by the bulk ingestion
+upsert, and by ``load_rates`` whenever new rates are loaded.
+"""
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import engine as default_engine, utcnow
+from app.models.fx_rate import FxRate
+from app.models.property import Property
+from app.services.markets import currency_for_market
+
+# A single entry holding the whole (small) rate table
+rate_cache = TTLCache(maxsize=1, ttl=settings.FX_CACHE_TTL_SECONDS)
+
+def get_rates() -> Dict[str, float]:
+    """Units of each currency per one ``BASE_CURRENCY``"""
+    rates = rate_cache.get("rates")
+    if rates is None:
+        with default_engine.connect() as connection:
+            rates = dict(connection.execute(select(FxRate.currency, FxRate.units_per_base)).all())
+        rates[settings.BASE_CURRENCY] = 1.0
+        rate_cache.set("rates", rates)
+    return rates
+
+def normalize_price(price: Optional[float], currency: Optional[str]) -> Optional[float]:
+    """``price`` converted to ``BASE_CURRENCY``, or None without a rate for ``currency``"""
+    if price is None or currency is None:
+        return None
+    rate = get_rates().get(currency)
+    return price / rate if rate else None
+
+def normalized_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the currency and normalized price of a listing row written without the ORM"""
+    if not values.get("currency"):
+        values["currency"] = currency_for_market(values.get("market"))
+    values["price_normalized"] = normalize_price(values.get("price"), values["currency"])
+    return values
+
+def parse_rates_file(path: str) -> Dict[str, float]:
+    """Read rates from JSON (``{"base": "EUR", "rates": {"SEK": 11.5}}``) or CSV (``currency,rate``
+    against ``BASE_CURRENCY``), rebased onto ``BASE_CURRENCY``"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            base = settings.BASE_CURRENCY
+            raw = {row["currency"]: row["rate"] for row in csv.DictReader(f)}
+        else:
+            document = json.load(f)
+            base = str(document.get("base", settings.BASE_CURRENCY)).upper()
+            raw = document.get("rates") or {}
+
+    rates = {base: 1.0}
+    for currency, rate in raw.items():
+        rate = float(rate)
+        if rate <= 0:
+            raise ValueError(f"Invalid rate {rate} for {currency}")
+        rates[str(currency).strip().upper()] = rate
+
+    if settings.BASE_CURRENCY not in rates:
+        raise ValueError(f"Rates against {base} do not include the base currency {settings.BASE_CURRENCY}")
+    base_rate = rates[settings.BASE_CURRENCY]
+    return {currency: rate / base_rate for currency, rate in rates.items()}
+
+def renormalize(engine, currencies: Iterable[str], batch_size: Optional[int] = None) -> int:
+    """Recompute ``price_normalized`` of the listings priced in ``currencies``, in id-range batches"""
+    batch_size = batch_size or settings.FX_RENORMALIZE_BATCH_SIZE
+    rates = get_rates()
+    updated = 0
+    for currency in currencies:
+        rate = rates.get(currency)
+        with engine.connect() as connection:
+            first_id, last_id = connection.execute(
+                select(func.min(Property.id), func.max(Property.id)).where(Property.currency == currency)
+            ).one()
+        if first_id is None:
+            continue
+        for start in range(first_id, last_id + 1, batch_size):
+            with engine.begin() as connection:
+                # price_normalized is part of the listing representation, so
+                # updated_at moves too and cached copies are revalidated
+                result = connection.execute(update(Property).where(
+                    Property.currency == currency,
+                    Property.id >= start,
+                    Property.id < start + batch_size,
+                ).values(
+                    price_normalized=Property.price / rate if rate else None,
+                    updated_at=utcnow(),
+                ))
+                updated += result.rowcount
+    return updated
+
+def load_rates(path: str, engine=None, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Replace the rates of the currencies in ``path`` and re-price the affected listings"""
+    engine = engine or default_engine
+    rates = parse_rates_file(path)
+    with engine.begin() as connection:
+        connection.execute(delete(FxRate).where(FxRate.currency.in_(list(rates))))
+        connection.execute(insert(FxRate), [
+            {"currency": currency, "units_per_base": rate, "source": os.path.basename(path)}
+            for currency, rate in rates.items()
+        ])
+    rate_cache.clear()
+    return {"rates": len(rates), "listings": renormalize(engine, rates, batch_size)}
+
+@event.listens_for(Property, "before_insert")
+@event.listens_for(Property, "before_update")
+def _normalize_property_price(mapper, connection, target):
+    state = inspect(target)
+    # Moving a listing to another market moves it to that market's currency unless it was given one
+    moved = state.persistent and state.attrs.market.history.has_changes() and not state.attrs.currency.history.has_changes()
+    if not target.currency or moved:
+        target.currency = currency_for_market(target.market)
+    target.price_normalized = normalize_price(target.price, target.currency)
@@ -0,0 +1,110 @@
+"""Pool of inference worker processes.
+
+CPU-bound model execution runs in separate processes so it does not compete
+with request handling for the GIL of the API process. Preprocessed image
+arrays are written once into a shared memory block; only the block name, shape
+and dtype cross the process boundary, and results come back as small dicts.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Updated from request threads and from the executor's management thread
+_counters_lock = threading.Lock()
+_in_flight = 0
+_completed = 0
+_failed = 0
+
+def _init_worker():
+    from app.services.ai_service import load_models
+
+    load_models()
+
+def _run_in_worker(shm_name: str, shape: tuple, dtype: str, analysis_type: str) -> Dict[str, Any]:
+    import numpy as np
+    from app.services.ai_service import run_image_inference
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        try:
+            return run_image_inference(image, analysis_type)
+        finally:
+            # The view must be released before the block can be closed
+            del image
+    finally:
+        shm.close()
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the inference pool, starting it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.INFERENCE_WORKERS,
+                    mp_context=multiprocessing.get_context(settings.INFERENCE_START_METHOD),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+def _release(shm: shared_memory.SharedMemory, succeeded: bool):
+    global _in_flight, _completed, _failed
+    with _counters_lock:
+        _in_flight -= 1
+        if succeeded:
+            _completed += 1
+        else:
+            _failed += 1
+    shm.close()
+    shm.unlink()
+
+async def run_inference(image, analysis_type: str = "style") -> Dict[str, Any]:
+    """Run image inference on a preprocessed array in the worker pool"""
+    import numpy as np
+    global _in_flight
+
+    shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    with _counters_lock:
+        _in_flight += 1
+    try:
+        shared = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+        shared[...] = image
+        del shared
+        future = get_pool().submit(_run_in_worker, shm.name, image.shape, image.dtype.str, analysis_type)
+    except BaseException:
+        _release(shm, succeeded=False)
+        raise
+
+    # The block is released once the worker is done with it, not when the
+    # caller stops waiting: a cancelled request must not unlink it under a
+    # worker that has yet to attach
+    future.add_done_callback(lambda done: _release(shm, not done.cancelled() and done.exception() is None))
+    waiter = asyncio.wrap_future(future)
+    # Retrieve the outcome even when nobody awaits it any more, so it is not logged as unhandled
+    waiter.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return await asyncio.shield(waiter)
+
+def stats() -> Dict[str, Any]:
+    return {
+        "workers": settings.INFERENCE_WORKERS,
+        "started": _pool is not None,
+        "in_flight": _in_flight,
+        "completed": _completed,
+        "failed": _failed,
+    }
+
+def shutdown():
+    """Stop the worker processes, if they were started"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
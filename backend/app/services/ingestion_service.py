@@ -0,0 +1,160 @@
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert as generic_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import utcnow
+from app.models.property import Property
+from app.schemas.property import PropertyCreate
+from app.services.fx_rates import normalized_values
+
+INGEST_FORMATS = ("ndjson", "csv")
+
+# CSV cells holding JSON documents
+JSON_COLUMNS = ("features", "images")
+
+# Raw rows are (row_number, dict) or (row_number, exception) when parsing failed
+RawRow = Tuple[int, Any]
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Guess the feed format from a file name"""
+    if not filename:
+        return None
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension in ("ndjson", "jsonl", "json"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    return None
+
+def iter_ndjson_rows(stream: TextIO) -> Iterator[RawRow]:
+    """Yield one row per non-empty line of a newline-delimited JSON stream"""
+    for row_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, e
+
+def iter_csv_rows(stream: TextIO) -> Iterator[RawRow]:
+    """Yield one row per CSV record; empty cells become None"""
+    reader = csv.DictReader(stream)
+    for row_number, record in enumerate(reader, start=1):
+        try:
+            row = {key: (value if value != "" else None) for key, value in record.items() if key}
+            for column in JSON_COLUMNS:
+                if row.get(column) is not None:
+                    row[column] = json.loads(row[column])
+            yield row_number, row
+        except ValueError as e:
+            yield row_number, e
+
+def iter_rows(stream: TextIO, file_format: str) -> Iterator[RawRow]:
+    if file_format == "csv":
+        return iter_csv_rows(stream)
+    return iter_ndjson_rows(stream)
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+class IngestionService:
+    """Validates listing rows incrementally and upserts them in batches.
+
+    Rows are keyed on ``external_id``: existing listings are updated in place,
+    rows without an external id are always inserted. Only one batch is held in
+    memory at a time.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_reported_errors: Optional[int] = None):
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.max_reported_errors = (
+            max_reported_errors if max_reported_errors is not None else settings.INGEST_MAX_REPORTED_ERRORS
+        )
+
+    def ingest(self, rows: Iterable[RawRow], db: Session) -> Dict[str, Any]:
+        report = {"processed": 0, "upserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        for row_number, raw in rows:
+            report["processed"] += 1
+
+            if isinstance(raw, Exception):
+                self._record_error(report, row_number, f"Could not parse row: {raw}")
+                continue
+            try:
+                listing = PropertyCreate.model_validate(raw)
+            except ValidationError as e:
+                self._record_error(report, row_number, _format_validation_error(e))
+                continue
+
+            batch.append((row_number, normalized_values(listing.model_dump())))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, db, report)
+                batch = []
+
+        if batch:
+            self._flush(batch, db, report)
+
+        return report
+
+    def _record_error(self, report: Dict[str, Any], row_number: int, message: str):
+        report["failed"] += 1
+        if len(report["errors"]) < self.max_reported_errors:
+            report["errors"].append({"row": row_number, "error": message})
+        else:
+            report["errors_truncated"] = True
+
+    def _upsert_statement(self, db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return generic_insert(Property)
+
+        stmt = insert(Property)
+        updated_columns = {
+            name: stmt.excluded[name]
+            for name in PropertyCreate.model_fields
+            if name != "external_id"
+        }
+        updated_columns["price_normalized"] = stmt.excluded.price_normalized
+        updated_columns["updated_at"] = utcnow()
+        return stmt.on_conflict_do_update(index_elements=[Property.external_id], set_=updated_columns)
+
+    def _flush(self, batch: List[Tuple[int, Dict[str, Any]]], db: Session, report: Dict[str, Any]):
+        # A feed may repeat an external id; only the last occurrence is kept, as
+        # one statement cannot upsert the same row twice
+        deduplicated: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+        for row_number, values in batch:
+            key = values["external_id"] if values["external_id"] is not None else ("row", row_number)
+            deduplicated[key] = (row_number, values)
+        entries = list(deduplicated.values())
+
+        stmt = self._upsert_statement(db)
+        try:
+            db.execute(stmt, [values for _, values in entries])
+            db.commit()
+            report["upserted"] += len(batch)
+            return
+        except SQLAlchemyError:
+            db.rollback()
+
+        # Retry row by row so one bad row does not fail the whole batch
+        report["upserted"] += len(batch) - len(entries)
+        for row_number, values in entries:
+            try:
+                db.execute(stmt, [values])
+                db.commit()
+                report["upserted"] += 1
+            except SQLAlchemyError as e:
+                db.rollback()
+                self._record_error(report, row_number, str(e.orig if getattr(e, "orig", None) else e))
@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, delete, event, func, insert, or_, select
+from sqlalchemy.orm import Session
+from app.models.ai_analysis import AIAnalysis, LatestAnalysis
+
+Key = Tuple[int, str]
+
+def _newest_first():
+    return (AIAnalysis.created_at.desc(), AIAnalysis.id.desc())
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(LatestAnalysis)
+    newer = or_(
+        LatestAnalysis.created_at.is_(None),
+        stmt.excluded.created_at > LatestAnalysis.created_at,
+        and_(stmt.excluded.created_at == LatestAnalysis.created_at, stmt.excluded.analysis_id > LatestAnalysis.analysis_id),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[LatestAnalysis.property_id, LatestAnalysis.analysis_type],
+        set_={"analysis_id": stmt.excluded.analysis_id, "created_at": stmt.excluded.created_at},
+        where=newer,
+    )
+
+def refresh_latest(connection, keys: Iterable[Key]):
+    """Recompute the pointers of ``keys`` from ``ai_analyses``"""
+    for property_id, analysis_type in keys:
+        connection.execute(delete(LatestAnalysis).where(
+            LatestAnalysis.property_id == property_id,
+            LatestAnalysis.analysis_type == analysis_type,
+        ))
+        newest = connection.execute(
+            select(AIAnalysis.id, AIAnalysis.created_at).where(
+                AIAnalysis.property_id == property_id,
+                AIAnalysis.analysis_type == analysis_type,
+            ).order_by(*_newest_first()).limit(1)
+        ).first()
+        if newest is not None:
+            connection.execute(insert(LatestAnalysis).values(
+                property_id=property_id,
+                analysis_type=analysis_type,
+                analysis_id=newest.id,
+                created_at=newest.created_at,
+            ))
+
+def record_latest(connection, analyses: Iterable[AIAnalysis]):
+    """Point each (property, type) at the newest of ``analyses`` if it is newer than the current one"""
+    newest: Dict[Key, AIAnalysis] = {}
+    for analysis in analyses:
+        if analysis.property_id is None or analysis.analysis_type is None:
+            continue
+        key = (analysis.property_id, analysis.analysis_type)
+        current = newest.get(key)
+        if current is None or (analysis.created_at, analysis.id) > (current.created_at, current.id):
+            newest[key] = analysis
+    if not newest:
+        return
+
+    stmt = _upsert_statement(connection.dialect.name)
+    if stmt is None:
+        refresh_latest(connection, newest.keys())
+        return
+    connection.execute(stmt, [
+        {
+            "property_id": property_id,
+            "analysis_type": analysis_type,
+            "analysis_id": analysis.id,
+            "created_at": analysis.created_at,
+        }
+        for (property_id, analysis_type), analysis in newest.items()
+    ])
+
+def rebuild_latest(connection) -> int:
+    """Rebuild every pointer from ``ai_analyses``, e.g. after bulk loads that bypass the ORM"""
+    ranked = select(
+        AIAnalysis.property_id,
+        AIAnalysis.analysis_type,
+        AIAnalysis.id.label("analysis_id"),
+        AIAnalysis.created_at,
+        func.row_number().over(
+            partition_by=(AIAnalysis.property_id, AIAnalysis.analysis_type),
+            order_by=_newest_first(),
+        ).label("position"),
+    ).where(AIAnalysis.property_id.isnot(None), AIAnalysis.analysis_type.isnot(None)).subquery()
+
+    connection.execute(delete(LatestAnalysis))
+    result = connection.execute(insert(LatestAnalysis).from_select(
+        ["property_id", "analysis_type", "analysis_id", "created_at"],
+        select(ranked.c.property_id, ranked.c.analysis_type, ranked.c.analysis_id, ranked.c.created_at)
+        .where(ranked.c.position == 1),
+    ))
+    return result.rowcount
+
+def backfill_latest(engine) -> int:
+    """Build the pointers once for databases created before the pointer table existed"""
+    with engine.begin() as connection:
+        if connection.execute(select(LatestAnalysis.analysis_id).limit(1)).first() is not None:
+            return 0
+        if connection.execute(select(AIAnalysis.id).limit(1)).first() is None:
+            return 0
+        return rebuild_latest(connection)
+
+def get_latest(db: Session, property_id: int, analysis_types: Optional[List[str]] = None) -> List[AIAnalysis]:
+    """Newest analysis per type for a property, newest first, via the pointer table"""
+    query = db.query(AIAnalysis).join(
+        LatestAnalysis, LatestAnalysis.analysis_id == AIAnalysis.id
+    ).filter(LatestAnalysis.property_id == property_id)
+    if analysis_types:
+        query = query.filter(LatestAnalysis.analysis_type.in_(analysis_types))
+    return query.order_by(*_newest_first()).all()
+
+def history_page(query, cursor: Optional[int], limit: int) -> Tuple[List[AIAnalysis], Optional[int]]:
+    """One page of ``query`` (already filtered to a property) newest first, after the ``cursor`` analysis id"""
+    if cursor is not None:
+        # Compare against the cursor row's own timestamp, resolved by the database
+        cursor_created = select(AIAnalysis.created_at).where(AIAnalysis.id == cursor).scalar_subquery()
+        query = query.filter(or_(
+            AIAnalysis.created_at < cursor_created,
+            and_(AIAnalysis.created_at == cursor_created, AIAnalysis.id < cursor),
+        ))
+    analyses = query.order_by(*_newest_first()).limit(limit + 1).all()
+    next_cursor = analyses[limit - 1].id if len(analyses) > limit else None
+    return analyses[:limit], next_cursor
+
+# Keep the pointers in step with analyses written through the ORM
+
+@event.listens_for(Session, "before_flush")
+def _release_deleted_analyses(session, flush_context, instances):
+    # Pointers must go before the analyses they reference are deleted
+    deleted = [
+        obj for obj in session.deleted
+        if isinstance(obj, AIAnalysis) and obj.id is not None
+    ]
+    if not deleted:
+        return
+    session.connection().execute(
+        delete(LatestAnalysis).where(LatestAnalysis.analysis_id.in_([obj.id for obj in deleted]))
+    )
+    session.info.setdefault("released_analysis_keys", set()).update(
+        (obj.property_id, obj.analysis_type) for obj in deleted
+        if obj.property_id is not None and obj.analysis_type is not None
+    )
+
+@event.listens_for(Session, "after_flush")
+def _update_latest_analyses(session, flush_context):
+    added = [obj for obj in session.new if isinstance(obj, AIAnalysis)]
+    if added:
+        record_latest(session.connection(), added)
+
+    released = session.info.pop("released_analysis_keys", None)
+    if released:
+        refresh_latest(session.connection(), released)
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Iterable, List
+from sqlalchemy.orm import Session
+from app.models.property import Property
+
+# Columns needed to render a listing card. Long text, feature documents and
+# the full image list are left out; only the first image is extracted in SQL.
+SUMMARY_COLUMNS = [
+    Property.id,
+    Property.title,
+    Property.price,
+    Property.currency,
+    Property.area,
+    Property.rooms,
+    Property.bedrooms,
+    Property.bathrooms,
+    Property.address,
+    Property.city,
+    Property.market,
+    Property.property_type,
+    Property.condition,
+    Property.images[0].as_string().label("thumbnail"),
+]
+
+SUMMARY_FIELDS = [column.key for column in SUMMARY_COLUMNS]
+
+def summary_query(db: Session):
+    """Query over active listings returning summary rows instead of ORM objects"""
+    return db.query(*SUMMARY_COLUMNS).filter(Property.is_active == True)
+
+def to_summary(row: Any) -> Dict[str, Any]:
+    """Summary fields of a row that may carry extra (scoring) columns"""
+    return {field: getattr(row, field) for field in SUMMARY_FIELDS}
+
+def to_summaries(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [row._asdict() for row in rows]
@@ -0,0 +1,31 @@
+from typing import Optional
+from app.core.config import settings
+from app.models.property import Property
+
+def normalize_market(market: Optional[str]) -> Optional[str]:
+    """Upper-cased market code; raises ValueError for markets we do not serve"""
+    if market is None:
+        return None
+    code = market.strip().upper()
+    if code not in settings.MARKETS:
+        raise ValueError(f"Unknown market {market!r}, expected one of: {', '.join(settings.MARKETS)}")
+    return code
+
+def normalize_currency(currency: Optional[str]) -> Optional[str]:
+    """Upper-cased ISO 4217 code; raises ValueError for anything else"""
+    if currency is None:
+        return None
+    code = currency.strip().upper()
+    if len(code) != 3 or not code.isalpha():
+        raise ValueError(f"Invalid currency {currency!r}, expected a three-letter ISO 4217 code")
+    return code
+
+def currency_for_market(market: Optional[str]) -> str:
+    """Currency listings of ``market`` are priced in unless they say otherwise"""
+    return settings.MARKET_CURRENCIES.get(market or settings.DEFAULT_MARKET, settings.BASE_CURRENCY)
+
+def in_market(query, market: Optional[str]):
+    """Restrict a query or select over properties to one market, so it only scans that market's index range"""
+    if market is None:
+        return query
+    return query.filter(Property.market == market)
@@ -1,9 +1,14 @@
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from app.models.property import Property
+from app.core.config import settings
+from app.models.property import Property, UserFavorite
 from app.models.user import User, SearchHistory
 from app.models.ai_analysis import AIAnalysis, StyleCategory
 from app.services.ai_service import AIService
+from app.services.collaborative_filtering import similarity_index
+from app.services.listing_summary import SUMMARY_COLUMNS, summary_query
+from app.services.markets import in_market
+from app.services.user_profile import UserProfile, profile_cache
 import json
 
 class RecommendationService:
@@ -15,76 +20,139 @@ class RecommendationService:
         user_id: int, 
         db: Session, 
         limit: int = 10,
-        recommendation_type: Optional[str] = None
+        recommendation_type: Optional[str] = None,
+        market: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get personalized recommendations for a user"""
+        """Get personalized recommendations for a user.
         
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return []
+        Results carry the scored listing rows, so callers need no further
+        queries to render them. Candidates come from ``market``, or the
+        user's preferred market, when one is given.
+        """
         
-        # Get user preferences
-        preferences = user.preferences or {}
-        
-        # Get user's search history
-        search_history = db.query(SearchHistory).filter(
-            SearchHistory.user_id == user_id
-        ).order_by(SearchHistory.created_at.desc()).limit(10).all()
+        profile = await self._get_user_profile(user_id, db)
+        preferences = profile.preferences
+        market = market or profile.market
         
         # Get user's favorite properties
-        favorite_property_ids = [fav.property_id for fav in user.favorites]
+        favorite_property_ids = [
+            row.property_id for row in
+            db.query(UserFavorite.property_id).filter(UserFavorite.user_id == user_id)
+        ]
         
-        # Build recommendation query
-        query = db.query(Property).filter(Property.is_active == True)
+        candidates: Dict[int, Any] = {}
         
-        # Apply preference filters
-        if preferences.get("price_range"):
-            min_price, max_price = preferences["price_range"]
-            query = query.filter(Property.price >= min_price, Property.price <= max_price)
+        # Preference-based candidates
+        if recommendation_type != "collaborative":
+            query = in_market(summary_query(db), market)
+            
+            # Apply preference filters
+            if profile.price_range:
+                min_price, max_price = profile.price_range
+                query = query.filter(Property.price >= min_price, Property.price <= max_price)
+            
+            if profile.property_types:
+                query = query.filter(Property.property_type.in_(list(profile.property_types)))
+            
+            if profile.cities:
+                query = query.filter(Property.city.in_(list(profile.cities)))
+            
+            # Exclude already favorited properties
+            if favorite_property_ids:
+                query = query.filter(~Property.id.in_(favorite_property_ids))
+            
+            # Get many more than needed, the whole batch is scored at once
+            for property in query.limit(max(settings.RECOMMENDATION_CANDIDATES, limit)).all():
+                candidates[property.id] = property
+        
+        # Behavioural candidates: properties favorited together with the user's favorites
+        cf_scores: Dict[int, float] = {}
+        if favorite_property_ids and recommendation_type != "preferences":
+            # Built in the background; until then there are no behavioural candidates
+            similarity_index.start()
+            cf_scores = dict(similarity_index.recommend(favorite_property_ids, settings.CF_CANDIDATES))
+            
+            missing_ids = [property_id for property_id in cf_scores if property_id not in candidates]
+            if missing_ids:
+                for property in in_market(summary_query(db), market).filter(Property.id.in_(missing_ids)).all():
+                    candidates[property.id] = property
+        
+        if not candidates:
+            return []
         
-        if preferences.get("property_types"):
-            query = query.filter(Property.property_type.in_(preferences["property_types"]))
+        # Score all candidates in one vectorized pass
+        import numpy as np
+        
+        properties = list(candidates.values())
+        scores = profile.score(properties)
+        
+        max_cf_score = max(cf_scores.values(), default=0.0)
+        if max_cf_score:
+            cf_normalized = np.fromiter(
+                (cf_scores.get(property.id, 0.0) for property in properties), np.float64, len(properties)
+            ) / max_cf_score
+            scores = (1 - settings.CF_WEIGHT) * scores + settings.CF_WEIGHT * cf_normalized
+        
+        # Only the top results need a reason
+        top = np.argsort(-scores, kind="stable")[:limit]
+        
+        recommendations = []
+        for index in top:
+            property = properties[index]
+            if cf_scores.get(property.id, 0.0) > 0:
+                reason = "Popular with users who liked your favorites"
+            else:
+                reason = self._get_recommendation_reason(property, float(scores[index]), preferences)
+            
+            recommendations.append({
+                "property_id": property.id,
+                "property": property,
+                "score": float(scores[index]),
+                "reason": reason
+            })
         
-        if preferences.get("cities"):
-            query = query.filter(Property.city.in_(preferences["cities"]))
+        return recommendations
+    
+    async def _get_user_profile(self, user_id: int, db: Session) -> UserProfile:
+        """Get the user's compiled preference profile, compiling it on a cache miss"""
         
-        # Exclude already favorited properties
-        if favorite_property_ids:
-            query = query.filter(~Property.id.in_(favorite_property_ids))
+        profile = profile_cache.get(user_id)
+        if profile is not None:
+            return profile
         
-        # Get properties
-        properties = query.limit(limit * 2).all()  # Get more than needed for scoring
+        user = db.query(User.id, User.preferences).filter(User.id == user_id).first()
+        if not user:
+            raise ValueError(f"User {user_id} not found")
         
-        # Score properties based on user preferences and behavior
-        scored_properties = []
-        for property in properties:
-            score = await self._calculate_recommendation_score(
-                property, user, search_history, preferences
-            )
-            scored_properties.append({
-                "property_id": property.id,
-                "score": score,
-                "reason": self._get_recommendation_reason(property, score, preferences)
-            })
+        # Get user's search history
+        search_history = db.query(SearchHistory.search_query).filter(
+            SearchHistory.user_id == user_id
+        ).order_by(SearchHistory.created_at.desc()).limit(10).all()
         
-        # Sort by score and return top results
-        scored_properties.sort(key=lambda x: x["score"], reverse=True)
-        return scored_properties[:limit]
+        profile = UserProfile.compile(user.preferences, (search.search_query for search in search_history))
+        profile_cache.set(user_id, profile)
+        return profile
     
     async def get_style_based_recommendations(
         self,
         style_keywords: List[str],
         db: Session,
-        limit: int = 10
+        limit: int = 10,
+        market: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Get recommendations based on style keywords"""
         
-        # Find properties with matching style analysis
-        style_analyses = db.query(AIAnalysis).filter(
+        # Find active properties with matching style analysis, loaded together
+        # with the listing columns in a single query
+        style_analyses = in_market(db.query(AIAnalysis.detected_styles, *SUMMARY_COLUMNS).join(
+            Property, Property.id == AIAnalysis.property_id
+        ).filter(
+            Property.is_active == True,
             AIAnalysis.detected_styles.isnot(None)
-        ).all()
+        ), market).all()
         
-        scored_properties = []
+        # Keep the best matching analysis per property
+        best_matches: Dict[int, Dict[str, Any]] = {}
         for analysis in style_analyses:
             if not analysis.detected_styles:
                 continue
@@ -95,14 +163,17 @@ class RecommendationService:
             )
             
             if style_match_score > 0.3:  # Only include if reasonable match
-                scored_properties.append({
-                    "property_id": analysis.property_id,
-                    "score": style_match_score,
-                    "reason": f"Style match: {', '.join(style_keywords)}"
-                })
+                current = best_matches.get(analysis.id)
+                if current is None or style_match_score > current["score"]:
+                    best_matches[analysis.id] = {
+                        "property_id": analysis.id,
+                        "property": analysis,
+                        "score": style_match_score,
+                        "reason": f"Style match: {', '.join(style_keywords)}"
+                    }
         
         # Sort by score and return top results
-        scored_properties.sort(key=lambda x: x["score"], reverse=True)
+        scored_properties = sorted(best_matches.values(), key=lambda x: x["score"], reverse=True)
         return scored_properties[:limit]
     
     async def get_similar_properties(
@@ -113,22 +184,31 @@ class RecommendationService:
     ) -> List[Dict[str, Any]]:
         """Get properties similar to the given property"""
         
-        target_property = db.query(Property).filter(Property.id == property_id).first()
+        target_property = db.query(*SUMMARY_COLUMNS, Property.price_normalized).filter(Property.id == property_id).first()
         if not target_property:
-            return []
+            raise ValueError(f"Property {property_id} not found")
         
-        # Get properties with similar characteristics
-        similar_properties = db.query(Property).filter(
-            Property.is_active == True,
+        # Get properties with similar characteristics in the same market
+        candidates = in_market(summary_query(db).add_columns(Property.price_normalized), target_property.market).filter(
             Property.id != property_id,
             Property.property_type == target_property.property_type
-        ).limit(limit * 2).all()
+        )
+        similar_properties = []
+        if target_property.price_normalized:
+            # Listings in a similar price band first, found by a range scan on the normalized price
+            similar_properties = candidates.filter(Property.price_normalized.between(
+                target_property.price_normalized * 0.8, target_property.price_normalized * 1.25
+            )).limit(limit * 2).all()
+        if len(similar_properties) < limit * 2:
+            seen = [property.id for property in similar_properties]
+            similar_properties += candidates.filter(Property.id.notin_(seen)).limit(limit * 2 - len(seen)).all()
         
         scored_properties = []
         for property in similar_properties:
             similarity_score = self._calculate_similarity_score(target_property, property)
             scored_properties.append({
                 "property_id": property.id,
+                "property": property,
                 "score": similarity_score,
                 "reason": "Similar property characteristics"
             })
@@ -140,14 +220,15 @@ class RecommendationService:
     async def get_trending_properties(
         self,
         db: Session,
-        limit: int = 10
+        limit: int = 10,
+        market: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Get trending properties based on recent activity"""
         
         # Mock trending logic - in a real implementation, you would track views, clicks, etc.
-        trending_properties = db.query(Property).filter(
-            Property.is_active == True
-        ).order_by(Property.created_at.desc()).limit(limit * 2).all()
+        trending_properties = in_market(summary_query(db), market).order_by(
+            Property.created_at.desc()
+        ).limit(limit * 2).all()
         
         scored_properties = []
         for i, property in enumerate(trending_properties):
@@ -155,6 +236,7 @@ class RecommendationService:
             trending_score = 1.0 - (i * 0.1) + (hash(str(property.id)) % 100) / 1000
             scored_properties.append({
                 "property_id": property.id,
+                "property": property,
                 "score": trending_score,
                 "reason": "Trending property"
             })
@@ -163,48 +245,6 @@ class RecommendationService:
         scored_properties.sort(key=lambda x: x["score"], reverse=True)
         return scored_properties[:limit]
     
-    async def _calculate_recommendation_score(
-        self,
-        property: Property,
-        user: User,
-        search_history: List[SearchHistory],
-        preferences: Dict[str, Any]
-    ) -> float:
-        """Calculate recommendation score for a property"""
-        
-        score = 0.0
-        
-        # Price preference score
-        if preferences.get("price_range"):
-            min_price, max_price = preferences["price_range"]
-            if min_price <= property.price <= max_price:
-                score += 0.3
-        
-        # Property type preference score
-        if preferences.get("property_types") and property.property_type in preferences["property_types"]:
-            score += 0.2
-        
-        # Location preference score
-        if preferences.get("cities") and property.city in preferences["cities"]:
-            score += 0.2
-        
-        # Size preference score (mock logic)
-        if preferences.get("min_rooms") and property.rooms and property.rooms >= preferences["min_rooms"]:
-            score += 0.1
-        
-        # Style preference score (if user has style preferences)
-        if preferences.get("preferred_styles"):
-            # This would require style analysis of the property
-            score += 0.1
-        
-        # Search history relevance
-        for search in search_history:
-            if search.search_query and search.search_query.lower() in property.title.lower():
-                score += 0.1
-                break
-        
-        return min(score, 1.0)  # Cap at 1.0
-    
     def _calculate_style_match_score(
         self,
         detected_styles: List[Dict[str, Any]],
@@ -228,16 +268,19 @@ class RecommendationService:
     
     def _calculate_similarity_score(
         self,
-        target_property: Property,
-        candidate_property: Property
+        target_property: Any,
+        candidate_property: Any
     ) -> float:
         """Calculate similarity score between two properties"""
         
         score = 0.0
         
-        # Price similarity (within 20% range)
-        if target_property.price and candidate_property.price:
-            price_ratio = min(target_property.price, candidate_property.price) / max(target_property.price, candidate_property.price)
+        # Price similarity (within 20% range), in the base currency when both prices have a rate
+        target_price, candidate_price = target_property.price, candidate_property.price
+        if getattr(target_property, "price_normalized", None) and getattr(candidate_property, "price_normalized", None):
+            target_price, candidate_price = target_property.price_normalized, candidate_property.price_normalized
+        if target_price and candidate_price:
+            price_ratio = min(target_price, candidate_price) / max(target_price, candidate_price)
             if price_ratio > 0.8:
                 score += 0.3
         
@@ -266,7 +309,7 @@ class RecommendationService:
     
     def _get_recommendation_reason(
         self,
-        property: Property,
+        property: Any,
         score: float,
         preferences: Dict[str, Any]
     ) -> str:
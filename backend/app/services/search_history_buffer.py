@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import SearchHistory
+
+class SearchHistoryBuffer:
+    """Write-behind buffer for search events.
+
+    Searches only append to an in-memory queue; a background task inserts the
+    queued events into ``search_history`` in batches, either when a batch fills
+    up or every ``flush_interval`` seconds. When the queue is full new events
+    are dropped rather than slowing down searches. Remaining events are
+    flushed on shutdown.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+
+    def record(self, user_id: int, search_query: Optional[str], filters: Dict[str, Any], results_count: int):
+        with self._lock:
+            if len(self._events) >= self.max_size:
+                self.dropped += 1
+                return
+            self._events.append({
+                "user_id": user_id,
+                "search_query": search_query,
+                "filters": filters,
+                "results_count": results_count,
+                "created_at": datetime.utcnow(),
+            })
+            self.recorded += 1
+            full = len(self._events) >= self.batch_size
+
+        if full and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write all queued events to the database"""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                await asyncio.to_thread(self._write, batch)
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(self.batch_size, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(SearchHistory), batch)
+            db.commit()
+            self.flushed += len(batch)
+        except SQLAlchemyError as e:
+            db.rollback()
+            self.failed += len(batch)
+            print(f"Warning: Could not write {len(batch)} search history events: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._events),
+            "max_size": self.max_size,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+        }
+
+search_history_buffer = SearchHistoryBuffer(
+    max_size=settings.SEARCH_HISTORY_BUFFER_SIZE,
+    batch_size=settings.SEARCH_HISTORY_BATCH_SIZE,
+    flush_interval=settings.SEARCH_HISTORY_FLUSH_SECONDS,
+)
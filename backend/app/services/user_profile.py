@@ -0,0 +1,121 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.markets import normalize_market
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class UserProfile:
+    """A user's preferences and search history compiled for batch scoring.
+
+    Built once from the raw ``preferences`` JSON and recent search queries, so
+    scoring thousands of candidates does not re-read dict keys or lowercase
+    the same strings for every property.
+    """
+
+    def __init__(
+        self,
+        price_range: Optional[tuple] = None,
+        min_rooms: Optional[int] = None,
+        property_types: Iterable[str] = (),
+        cities: Iterable[str] = (),
+        style_weights: Optional[Dict[str, float]] = None,
+        history_terms: Iterable[str] = (),
+        market: Optional[str] = None
+    ):
+        self.price_range = price_range
+        self.min_rooms = min_rooms
+        self.property_types = frozenset(property_types)
+        self.cities = frozenset(cities)
+        self.style_weights = style_weights or {}
+        self.history_terms = tuple(history_terms)
+        self.market = market
+        self.preferences: Dict[str, Any] = {}
+
+    @classmethod
+    def compile(cls, preferences: Optional[Dict[str, Any]], search_queries: Iterable[Optional[str]]) -> "UserProfile":
+        preferences = preferences or {}
+
+        price_range = None
+        if preferences.get("price_range"):
+            min_price, max_price = preferences["price_range"]
+            price_range = (float(min_price), float(max_price))
+
+        styles = preferences.get("preferred_styles") or {}
+        if isinstance(styles, dict):
+            style_weights = {str(style).lower(): float(weight) for style, weight in styles.items()}
+        else:
+            style_weights = {str(style).lower(): 1.0 for style in styles}
+
+        history_terms = []
+        for query in search_queries:
+            for token in TOKEN_PATTERN.findall((query or "").lower()):
+                if len(token) >= settings.PROFILE_MIN_TERM_LENGTH and token not in history_terms:
+                    history_terms.append(token)
+
+        try:
+            market = normalize_market(preferences.get("market"))
+        except ValueError:
+            market = None
+
+        profile = cls(
+            price_range=price_range,
+            min_rooms=preferences.get("min_rooms"),
+            property_types=preferences.get("property_types") or (),
+            cities=preferences.get("cities") or (),
+            style_weights=style_weights,
+            history_terms=history_terms,
+            market=market
+        )
+        profile.preferences = preferences
+        return profile
+
+    def score(self, candidates: List[Any]):
+        """Score candidate rows in one vectorized pass, returning a NumPy array"""
+        import numpy as np
+
+        count = len(candidates)
+        scores = np.zeros(count, dtype=np.float64)
+        if not count:
+            return scores
+
+        # Price preference score
+        if self.price_range:
+            prices = np.fromiter((c.price if c.price is not None else np.nan for c in candidates), np.float64, count)
+            scores += 0.3 * ((prices >= self.price_range[0]) & (prices <= self.price_range[1]))
+
+        # Property type preference score
+        if self.property_types:
+            types = np.array([c.property_type or "" for c in candidates], dtype=object)
+            scores += 0.2 * np.isin(types, list(self.property_types))
+
+        # Location preference score
+        if self.cities:
+            cities = np.array([c.city or "" for c in candidates], dtype=object)
+            scores += 0.2 * np.isin(cities, list(self.cities))
+
+        # Size preference score
+        if self.min_rooms:
+            rooms = np.fromiter((c.rooms if c.rooms is not None else -1 for c in candidates), np.float64, count)
+            scores += 0.1 * (rooms >= self.min_rooms)
+
+        # Style preference score (property styles are not part of the candidate rows yet)
+        if any(weight > 0 for weight in self.style_weights.values()):
+            scores += 0.1
+
+        # Search history relevance
+        if self.history_terms:
+            titles = np.array([(c.title or "").lower() for c in candidates], dtype=str)
+            matched = np.zeros(count, dtype=bool)
+            for term in self.history_terms:
+                matched |= np.char.find(titles, term) >= 0
+            scores += 0.1 * matched
+
+        return np.minimum(scores, 1.0)  # Cap at 1.0
+
+# Compiled profiles keyed by user id
+profile_cache = TTLCache(maxsize=settings.USER_PROFILE_CACHE_SIZE, ttl=settings.USER_PROFILE_CACHE_TTL_SECONDS)
+
+def invalidate_user_profile(user_id: int):
+    profile_cache.invalidate(user_id)
@@ -0,0 +1,295 @@
+"""Generate a synthetic catalog for benchmarking.
+
+Writes properties, users, favorites, search history and AI analyses at the
+requested scale into any database SQLAlchemy can reach (SQLite or a local
+PostgreSQL), and a dataset manifest the benchmark runner uses to pick
+realistic request parameters. Listings are spread over every market, priced
+in its currency and normalized with the exchange rates stored in the target
+database (``BENCHMARK_RATES`` fill in any that are missing). Generation is
+seeded, so the same scale and seed always produce the same data.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.generate_data --properties 10000
+    python -m benchmarks.generate_data --properties 1000000 \\
+        --database-url postgresql://localhost/homegenius_bench
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.security import password_hasher
+from app.models.ai_analysis import AIAnalysis
+from app.models.fx_rate import FxRate
+from app.models.property import Property, UserFavorite
+from app.models.user import SearchHistory, User
+from app.services.fx_rates import normalized_values, rate_cache
+from app.services.latest_analysis import rebuild_latest
+
+MARKET_CITIES = {
+    "SE": ["Stockholm", "Göteborg", "Malmö", "Uppsala", "Västerås", "Örebro",
+           "Linköping", "Helsingborg", "Jönköping", "Norrköping", "Lund", "Umeå"],
+    "US": ["New York", "Los Angeles", "Chicago", "Houston", "Seattle", "Boston"],
+    "UK": ["London", "Manchester", "Birmingham", "Leeds", "Bristol", "Edinburgh"],
+    "DE": ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart"],
+    "FR": ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Bordeaux"],
+}
+CITIES = [city for cities in MARKET_CITIES.values() for city in cities]
+PROPERTY_TYPES = ["apartment", "house", "townhouse", "villa", "cottage"]
+CONDITIONS = ["new", "renovated", "good", "needs_renovation"]
+FEATURES = ["balcony", "garden", "parking", "elevator", "fireplace", "sauna", "sea_view", "garage"]
+STYLES = ["modern", "minimalist", "scandinavian", "industrial", "classic", "contemporary", "rustic", "bohemian"]
+TITLE_WORDS = ["Bright", "Spacious", "Cozy", "Modern", "Renovated", "Charming", "Central", "Quiet", "Classic"]
+SEARCH_TERMS = ["balcony", "modern", "central", "garden", "sea view", "renovated", "villa", "apartment"]
+
+# Users and related rows generated per property
+USERS_PER_PROPERTY = 0.1
+FAVORITES_PER_USER = 8
+SEARCHES_PER_USER = 5
+ANALYSES_PER_PROPERTY = 0.5
+
+# Share of listings in the default market; the rest are spread evenly over the others
+DEFAULT_MARKET_SHARE = 0.5
+
+# Units per EUR, used to price listings and stored when the database has no rate yet
+BENCHMARK_RATES = {"EUR": 1.0, "SEK": 11.5, "USD": 1.08, "GBP": 0.86}
+
+BENCHMARK_PASSWORD = "benchmark"
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _load_rates(engine) -> Dict[str, float]:
+    """Store the benchmark rates the database lacks and return the rates listings are normalized with"""
+    with engine.begin() as conn:
+        stored = dict(conn.execute(select(FxRate.currency, FxRate.units_per_base)).all())
+        base_rate = BENCHMARK_RATES[settings.BASE_CURRENCY]
+        missing = [
+            {"currency": currency, "units_per_base": rate / base_rate, "source": "benchmark"}
+            for currency, rate in BENCHMARK_RATES.items()
+            if currency not in stored and currency != settings.BASE_CURRENCY
+        ]
+        if missing:
+            conn.execute(insert(FxRate), missing)
+        rates = dict(conn.execute(select(FxRate.currency, FxRate.units_per_base)).all())
+    rates[settings.BASE_CURRENCY] = 1.0
+    # normalized_values reads the rates through this cache, which would otherwise
+    # be filled from DATABASE_URL rather than the target database
+    rate_cache.set("rates", rates)
+    return rates
+
+def _market(rng: random.Random) -> str:
+    others = [market for market in settings.MARKETS if market != settings.DEFAULT_MARKET]
+    if not others or rng.random() < DEFAULT_MARKET_SHARE:
+        return settings.DEFAULT_MARKET
+    return rng.choice(others)
+
+def _property_rows(rng: random.Random, first_id: int, count: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    for property_id in range(first_id, first_id + count):
+        property_type = rng.choice(PROPERTY_TYPES)
+        rooms = rng.randint(1, 8)
+        area = round(rng.uniform(20, 40) * rooms, 1)
+        market = _market(rng)
+        city = rng.choice(MARKET_CITIES.get(market) or CITIES)
+        currency = settings.MARKET_CURRENCIES[market]
+        # Square metre prices in EUR, in the listing's own currency
+        price = round(area * rng.uniform(2200, 7800) * BENCHMARK_RATES.get(currency, 1.0), -3)
+        yield normalized_values({
+            "id": property_id,
+            "external_id": f"bench-{property_id}",
+            "title": f"{rng.choice(TITLE_WORDS)} {rooms}-room {property_type} in {city}",
+            "description": f"Synthetic {property_type} listing generated for benchmarking.",
+            "price": price,
+            "market": market,
+            "currency": currency,
+            "area": area,
+            "rooms": rooms,
+            "bedrooms": max(rooms - 1, 1),
+            "bathrooms": rng.randint(1, 3),
+            "address": f"Benchmarkgatan {rng.randint(1, 200)}",
+            "city": city,
+            "postal_code": f"{rng.randint(100, 999)} {rng.randint(10, 99)}",
+            "latitude": round(rng.uniform(55.3, 67.9), 6),
+            "longitude": round(rng.uniform(11.0, 24.2), 6),
+            "property_type": property_type,
+            "condition": rng.choice(CONDITIONS),
+            "year_built": rng.randint(1890, 2024),
+            "floor": rng.randint(0, 12),
+            "total_floors": rng.randint(1, 15),
+            "features": {feature: True for feature in rng.sample(FEATURES, rng.randint(0, 4))},
+            "images": [f"/uploads/bench/{property_id}-{n}.jpg" for n in range(rng.randint(1, 5))],
+            "created_at": now - timedelta(minutes=rng.randint(0, 525600)),
+            "is_active": rng.random() > 0.05,
+        })
+
+def _user_rows(rng: random.Random, first_id: int, count: int, hashed_password: str) -> Iterator[Dict[str, Any]]:
+    for user_id in range(first_id, first_id + count):
+        min_price = rng.choice([1, 2, 3, 4]) * 1000000
+        yield {
+            "id": user_id,
+            "email": f"bench{user_id}@example.com",
+            "username": f"bench{user_id}",
+            "hashed_password": hashed_password,
+            "preferences": {
+                "price_range": [min_price, min_price * rng.choice([2, 3])],
+                "cities": rng.sample(CITIES, 2),
+                "property_types": rng.sample(PROPERTY_TYPES, 2),
+                "min_rooms": rng.randint(1, 4),
+                "preferred_styles": rng.sample(STYLES, 2),
+            },
+            "is_active": True,
+        }
+
+def _favorite_rows(rng: random.Random, users: range, properties: range) -> Iterator[Dict[str, Any]]:
+    # Users favorite within a few "neighbourhoods" of the catalog, which gives
+    # the co-occurrence matrix realistic clusters instead of uniform noise
+    cluster_size = 200
+    for user_id in users:
+        start = rng.randrange(properties.start, properties.stop)
+        span = range(start, min(start + cluster_size, properties.stop))
+        for property_id in rng.sample(span, min(FAVORITES_PER_USER, len(span))):
+            yield {"user_id": user_id, "property_id": property_id}
+
+def _search_rows(rng: random.Random, users: range, now: datetime) -> Iterator[Dict[str, Any]]:
+    for user_id in users:
+        for _ in range(SEARCHES_PER_USER):
+            yield {
+                "user_id": user_id,
+                "search_query": rng.choice(SEARCH_TERMS),
+                "filters": {"city": rng.choice(CITIES)},
+                "results_count": rng.randint(0, 500),
+                "created_at": now - timedelta(minutes=rng.randint(0, 43200)),
+            }
+
+def _analysis_rows(rng: random.Random, properties: range, count: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    for _ in range(count):
+        styles = rng.sample(STYLES, 3)
+        yield {
+            "property_id": rng.randrange(properties.start, properties.stop),
+            "predicted_price": round(rng.uniform(1e6, 1e7), -3),
+            "price_confidence": round(rng.uniform(0.5, 0.99), 2),
+            "detected_styles": [
+                {"style": style, "confidence": round(rng.uniform(0.3, 0.95), 2)} for style in styles
+            ],
+            "style_confidence": round(rng.uniform(0.5, 0.95), 2),
+            "quality_score": round(rng.uniform(0.5, 1.0), 2),
+            "model_version": "1.0.0",
+            "analysis_type": rng.choice(["price", "style", "combined"]),
+            "processing_time": round(rng.uniform(0.05, 2.0), 3),
+            "created_at": now - timedelta(minutes=rng.randint(0, 525600)),
+        }
+
+def _insert_batches(engine, model, rows: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    total = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        with engine.begin() as conn:
+            conn.execute(insert(model), batch)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+            total += len(batch)
+            batch = []
+    if batch:
+        flush()
+        total += len(batch)
+    return total
+
+def _sync_sequences(engine, models):
+    """Move PostgreSQL id sequences past the explicitly inserted ids"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for model in models:
+            table = model.__tablename__
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
+
+def generate(database_url: str, properties: int, seed: int, batch_size: int,
+             progress: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Generate a catalog of ``properties`` listings and return its manifest"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        first_property = _next_id(conn, Property)
+        first_user = _next_id(conn, User)
+
+    user_count = max(int(properties * USERS_PER_PROPERTY), 10)
+    property_ids = range(first_property, first_property + properties)
+    user_ids = range(first_user, first_user + user_count)
+    rates = _load_rates(engine)
+
+    # One real hash shared by every user, so the runner can log in if needed
+    hashed_password = password_hasher.context.hash(BENCHMARK_PASSWORD)
+
+    counts = {}
+    steps = [
+        ("properties", Property, lambda: _property_rows(rng, first_property, properties, now)),
+        ("users", User, lambda: _user_rows(rng, first_user, user_count, hashed_password)),
+        ("user_favorites", UserFavorite, lambda: _favorite_rows(rng, user_ids, property_ids)),
+        ("search_history", SearchHistory, lambda: _search_rows(rng, user_ids, now)),
+        ("ai_analyses", AIAnalysis, lambda: _analysis_rows(
+            rng, property_ids, int(properties * ANALYSES_PER_PROPERTY), now
+        )),
+    ]
+    for name, model, rows in steps:
+        start = time.perf_counter()
+        counts[name] = _insert_batches(engine, model, rows(), batch_size)
+        progress(f"{name}: {counts[name]} rows in {time.perf_counter() - start:.1f}s")
+
+    _sync_sequences(engine, [Property, User, UserFavorite, SearchHistory, AIAnalysis])
+    # Analyses were inserted without the ORM, so their latest-analysis pointers are built in one pass
+    with engine.begin() as conn:
+        counts["latest_analyses"] = rebuild_latest(conn)
+    engine.dispose()
+
+    return {
+        "database": engine.url.render_as_string(hide_password=True),
+        "dialect": engine.dialect.name,
+        "seed": seed,
+        "generated_at": now.isoformat(),
+        "counts": counts,
+        "property_ids": [property_ids.start, property_ids.stop - 1],
+        "user_ids": [user_ids.start, user_ids.stop - 1],
+        "cities": CITIES,
+        "markets": list(settings.MARKETS),
+        "currencies": sorted(rates),
+        "property_types": PROPERTY_TYPES,
+        "styles": STYLES,
+        "search_terms": SEARCH_TERMS,
+        "password": BENCHMARK_PASSWORD,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog for benchmarking")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db",
+                        help="Target database (default: sqlite:///./benchmark.db)")
+    parser.add_argument("--properties", type=int, default=10000, help="Number of listings (10k-1M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--manifest", default="benchmark_dataset.json",
+                        help="Where to write the dataset manifest read by the runner")
+    args = parser.parse_args()
+
+    manifest = generate(args.database_url, args.properties, args.seed, args.batch_size)
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Manifest written to {args.manifest}")
+
+if __name__ == "__main__":
+    main()
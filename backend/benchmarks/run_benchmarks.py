@@ -0,0 +1,260 @@
+"""Drive the main API endpoints with concurrent clients and report latency.
+
+Each scenario sends ``--requests`` requests from ``--concurrency`` concurrent
+clients against a running server, with parameters drawn from the dataset
+manifest written by ``benchmarks.generate_data``. Latency percentiles and
+throughput are printed and written to a JSON results file; passing an
+earlier results file with ``--compare`` reports regressions against it and
+exits non-zero when any scenario got slower than ``--tolerance`` allows.
+
+Rate-limited responses (429) are reported separately from other errors and
+are excluded from the latencies. The image analysis scenario is limited to
+10 requests a minute per client by default, so start the server with raised
+limits when benchmarking it, e.g.
+``RATE_LIMITS='{"analyze_property": "1000000/second", "analyze_image": "1000000/second"}'``;
+a comparison fails if any scenario was rate limited.
+
+Usage (from the backend directory, with the API running on the catalog):
+
+    python -m benchmarks.run_benchmarks --output baseline.json
+    python -m benchmarks.run_benchmarks --compare baseline.json --output current.json
+    python -m benchmarks.run_benchmarks --scenarios search similar --concurrency 32
+"""
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+def _search(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    min_price = rng.choice([1, 2, 3, 4]) * 1000000
+    params = {
+        "city": rng.choice(dataset["cities"]),
+        "min_price": min_price,
+        "max_price": min_price * 2,
+        "page": rng.randint(1, 3),
+    }
+    if rng.random() < 0.5:
+        params["property_type"] = rng.choice(dataset["property_types"])
+    if rng.random() < 0.3:
+        params["query"] = rng.choice(dataset["search_terms"])
+    return {"method": "GET", "url": "/api/properties/", "params": params}
+
+def _search_currency(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    # A EUR price range over every market, compared against the normalized prices
+    min_price = rng.choice([1, 2, 3, 4]) * 100000
+    params = {"currency": "EUR", "min_price": min_price, "max_price": min_price * 2, "page": rng.randint(1, 3)}
+    if rng.random() < 0.5:
+        params["property_type"] = rng.choice(dataset["property_types"])
+    return {"method": "GET", "url": "/api/properties/", "params": params}
+
+def _search_facets(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    request = _search(rng, dataset)
+    request["params"]["facets"] = "true"
+    return request
+
+def _property_id(rng: random.Random, dataset: Dict[str, Any]) -> int:
+    return rng.randint(*dataset["property_ids"])
+
+def _similar(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    return {"method": "GET", "url": f"/api/recommendations/similar/{_property_id(rng, dataset)}"}
+
+def _style_based(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "method": "GET",
+        "url": "/api/recommendations/style-based",
+        "params": {"style_keywords": rng.sample(dataset["styles"], 2)},
+    }
+
+def _trending(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    return {"method": "GET", "url": "/api/recommendations/trending"}
+
+def _user_recommendations(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    user_id = rng.randint(*dataset["user_ids"])
+    return {"method": "GET", "url": f"/api/recommendations/user/{user_id}/properties"}
+
+def _sample_image() -> bytes:
+    """A 640x480 JPEG, close to a typical listing photo upload"""
+    from PIL import Image
+
+    image = Image.effect_noise((640, 480), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+def _analyze_image(rng: random.Random, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "method": "POST",
+        "url": "/api/ai/analyze-image",
+        "files": {"file": ("listing.jpg", dataset["image"], "image/jpeg")},
+        "data": {"analysis_type": rng.choice(["style", "quality"])},
+    }
+
+SCENARIOS: Dict[str, Callable[[random.Random, Dict[str, Any]], Dict[str, Any]]] = {
+    "search": _search,
+    "search_currency": _search_currency,
+    "search_facets": _search_facets,
+    "similar": _similar,
+    "style_based": _style_based,
+    "trending": _trending,
+    "user_recommendations": _user_recommendations,
+    "analyze_image": _analyze_image,
+}
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "throughput_rps": True}
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def summarize(latencies: List[float], errors: int, rate_limited: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies) + errors + rate_limited,
+        "errors": errors,
+        "rate_limited": rate_limited,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    build_request: Callable[[random.Random, Dict[str, Any]], Dict[str, Any]],
+    dataset: Dict[str, Any],
+    total_requests: int,
+    concurrency: int,
+    seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    requests = [build_request(rng, dataset) for _ in range(total_requests)]
+    latencies: List[float] = []
+    errors = 0
+    rate_limited = 0
+
+    async def worker(worker_requests: List[Dict[str, Any]]):
+        nonlocal errors, rate_limited
+        for request in worker_requests:
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            if status == 429:
+                rate_limited += 1
+            elif status is None or status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(requests[i::concurrency]) for i in range(concurrency)])
+    return summarize(latencies, errors, rate_limited, time.perf_counter() - start)
+
+async def run(args, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        for name in args.scenarios:
+            if args.warmup:
+                await run_scenario(client, SCENARIOS[name], dataset, args.warmup, args.concurrency, args.seed + 1)
+            results[name] = await run_scenario(
+                client, SCENARIOS[name], dataset, args.requests, args.concurrency, args.seed
+            )
+            print(format_row(name, results[name]))
+            if results[name]["rate_limited"]:
+                print(f"Warning: {results[name]['rate_limited']} {name} requests were rate limited; "
+                      "raise RATE_LIMITS on the server for meaningful latencies")
+    return results
+
+def format_row(name: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{name:<22} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+        f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_rps']:>9.2f} req/s  "
+        f"errors {result['errors']}  rate limited {result['rate_limited']}"
+    )
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describe every metric that regressed by more than ``tolerance``"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        if result.get("rate_limited"):
+            regressions.append(f"{name}: {result['rate_limited']} requests rate limited")
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the main API endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--dataset", default="benchmark_dataset.json",
+                        help="Manifest written by benchmarks.generate_data")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative regression before failing (default: 0.1)")
+    args = parser.parse_args()
+
+    with open(args.dataset, encoding="utf-8") as f:
+        dataset = json.load(f)
+    if "analyze_image" in args.scenarios:
+        dataset["image"] = _sample_image()
+
+    scenarios = asyncio.run(run(args, dataset))
+    results = {
+        "started_at": datetime.utcnow().isoformat(),
+        "base_url": args.base_url,
+        "dataset": {key: dataset.get(key) for key in ("database", "dialect", "counts", "seed")},
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup},
+        "host": {"python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": scenarios,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against", args.compare)
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Apply the AI analysis retention policy once.
+
+Keeps the newest analyses per property and type, folds older ones into daily
+summaries and optionally archives them as gzipped NDJSON. Defaults come from
+the ``ANALYSIS_RETENTION_*`` and ``ANALYSIS_ARCHIVE_DIR`` settings.
+
+Usage (from the backend directory):
+
+    python -m scripts.compact_analyses --dry-run
+    python -m scripts.compact_analyses --keep-latest 5 --min-age-days 90 --archive-dir archive
+"""
+import argparse
+import json
+import sys
+
+from app.core.config import settings
+from app.models import property, user  # noqa: F401  Register every model for the relationships
+from app.services.analysis_retention import AnalysisCompactor
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the AI analysis history")
+    parser.add_argument("--keep-latest", type=int, default=settings.ANALYSIS_RETENTION_KEEP_LATEST,
+                        help="Analyses kept in full per property and type")
+    parser.add_argument("--min-age-days", type=int, default=settings.ANALYSIS_RETENTION_MIN_AGE_DAYS,
+                        help="Younger analyses are never compacted")
+    parser.add_argument("--batch-size", type=int, default=settings.ANALYSIS_COMPACTION_BATCH_SIZE,
+                        help="Analyses deleted per transaction")
+    parser.add_argument("--archive-dir", default=settings.ANALYSIS_ARCHIVE_DIR,
+                        help="Archive compacted analyses as gzipped NDJSON here")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the analyses that would be compacted")
+    args = parser.parse_args()
+
+    try:
+        compactor = AnalysisCompactor(
+            keep_latest=args.keep_latest,
+            min_age_days=args.min_age_days,
+            batch_size=args.batch_size,
+            archive_dir=args.archive_dir,
+        )
+        report = compactor.compact(dry_run=args.dry_run)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
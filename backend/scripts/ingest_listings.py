@@ -0,0 +1,38 @@
+"""Bulk upsert listings from an NDJSON or CSV feed file.
+
+Usage (from the backend directory):
+
+    python -m scripts.ingest_listings listings.ndjson
+    python -m scripts.ingest_listings listings.csv --batch-size 5000
+"""
+import argparse
+import json
+import sys
+
+from app.core.database import SessionLocal
+from app.services.ingestion_service import IngestionService, INGEST_FORMATS, detect_format, iter_rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk upsert listings from a feed file")
+    parser.add_argument("path", help="Feed file (NDJSON or CSV)")
+    parser.add_argument("--format", choices=INGEST_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, help="Rows per insert batch")
+    args = parser.parse_args()
+
+    file_format = args.format or detect_format(args.path)
+    if file_format is None:
+        sys.exit("Could not detect the feed format, pass --format")
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8", newline="") as stream:
+            report = IngestionService(batch_size=args.batch_size).ingest(iter_rows(stream, file_format), db)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2))
+    if report["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
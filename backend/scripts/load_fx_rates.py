@@ -0,0 +1,31 @@
+"""Load exchange rates and re-price the listings in the affected currencies.
+
+Rates are JSON (``{"base": "EUR", "rates": {"SEK": 11.5, "USD": 1.08}}``) or
+CSV with ``currency,rate`` columns quoted against ``BASE_CURRENCY``.
+
+Usage (from the backend directory):
+
+    python -m scripts.load_fx_rates rates.json
+    python -m scripts.load_fx_rates rates.csv --batch-size 50000
+"""
+import argparse
+import json
+import sys
+
+from app.models import property, user, ai_analysis  # noqa: F401  Register every model for the relationships
+from app.services.fx_rates import load_rates
+
+def main():
+    parser = argparse.ArgumentParser(description="Load exchange rates and re-price listings")
+    parser.add_argument("path", help="Rates file (JSON or CSV)")
+    parser.add_argument("--batch-size", type=int, help="Listings re-priced per UPDATE")
+    args = parser.parse_args()
+
+    try:
+        report = load_rates(args.path, batch_size=args.batch_size)
+    except (OSError, ValueError, KeyError) as e:
+        sys.exit(f"Could not load {args.path}: {e}")
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
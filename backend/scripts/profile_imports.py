@@ -0,0 +1,97 @@
+"""Import-time profile of the API application.
+
+Runs ``python -X importtime`` on the given module in a fresh interpreter and
+reports the slowest imports, so regressions in cold start time (for example a
+heavy ML dependency pulled in at module load) are easy to spot.
+
+Usage (from the backend directory):
+
+    python -m scripts.profile_imports
+    python -m scripts.profile_imports --module app.main --top 30 --json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+def run_importtime(module: str) -> Dict:
+    """Import ``module`` in a subprocess and collect ``-X importtime`` output"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    wall_time = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    return {"module": module, "wall_time_s": wall_time, "imports": entries}
+
+def summarize(profile: Dict, top: int) -> Dict:
+    """Aggregate the raw profile into top-level packages and slowest modules"""
+    imports: List[Dict] = profile["imports"]
+
+    # Attribute each module's own (self) time to its top-level package
+    packages: Dict[str, float] = {}
+    for entry in imports:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self_ms"]
+
+    slowest = sorted(imports, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+
+    return {
+        "module": profile["module"],
+        "wall_time_s": round(profile["wall_time_s"], 3),
+        "total_import_ms": round(sum(packages.values()), 1),
+        "modules_imported": len(imports),
+        "packages": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "slowest_modules": [
+            {"module": e["module"], "cumulative_ms": round(e["cumulative_ms"], 1), "self_ms": round(e["self_ms"], 1)}
+            for e in slowest
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of the API")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Number of entries to show")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = summarize(run_importtime(args.module), args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Import profile for {report['module']}")
+    print(f"  interpreter wall time: {report['wall_time_s']:.3f}s")
+    print(f"  total import time:     {report['total_import_ms']:.1f}ms ({report['modules_imported']} modules)")
+    print("\nTop-level packages (self time):")
+    for entry in report["packages"]:
+        print(f"  {entry['self_ms']:>10.1f}ms  {entry['package']}")
+    print("\nSlowest modules (cumulative / self):")
+    for entry in report["slowest_modules"]:
+        print(f"  {entry['cumulative_ms']:>10.1f}ms {entry['self_ms']:>8.1f}ms  {entry['module']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Create missing tables and bring existing ones up to the current models.
+
+Adds columns introduced since the database was created (backfilling them) and
+any missing indexes. Safe to run repeatedly; the API also runs it at startup.
+
+Usage (from the backend directory):
+
+    python -m scripts.upgrade_schema
+"""
+from app.core.database import init_db
+
+def main():
+    upgrades = init_db()
+    for upgrade in upgrades:
+        print(upgrade)
+    print(f"{len(upgrades)} schema changes applied")
+
+if __name__ == "__main__":
+    main()
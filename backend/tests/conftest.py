@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+# The engine is created on import, so point it at a throwaway database first
+_database_dir = tempfile.mkdtemp(prefix="homegenius-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+# Repeated statements within one request fail the test instead of being logged
+os.environ["QUERY_LOG_RAISE_ON_N_PLUS_ONE"] = "true"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, SessionLocal, engine, init_db
+from app.main import app
+from app.models.ai_analysis import AIAnalysis
+from app.models.property import Property, UserFavorite
+from app.models.user import SearchHistory, User
+from app.services.collaborative_filtering import similarity_index
+from app.services.user_profile import profile_cache
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def catalog(client):
+    """A small catalog: three users, listings in two markets, favorites and style analyses"""
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+
+    db = SessionLocal()
+    try:
+        users = [
+            User(
+                username=f"user{n}", email=f"user{n}@example.com", hashed_password="x",
+                preferences={"price_range": [1000000, 6000000], "property_types": ["apartment"], "cities": ["Stockholm"]},
+            )
+            for n in range(3)
+        ]
+        db.add_all(users)
+        properties = [
+            Property(
+                title=f"Listing {n}", price=1000000 + n * 100000, area=40 + n, rooms=1 + n % 4,
+                city="Stockholm" if n % 2 else "Göteborg", property_type="apartment" if n % 3 else "house",
+                market="SE", images=[f"/uploads/{n}.jpg"],
+            )
+            for n in range(30)
+        ]
+        db.add_all(properties)
+        db.flush()
+
+        for user in users:
+            db.add(SearchHistory(user_id=user.id, search_query="bright apartment balcony"))
+            for property in properties[:3]:
+                db.add(UserFavorite(user_id=user.id, property_id=property.id))
+        for property in properties[::2]:
+            db.add(AIAnalysis(
+                property_id=property.id, analysis_type="style", model_version="1.0.0",
+                detected_styles=[{"style": "modern", "confidence": 0.9}], style_confidence=0.9,
+            ))
+        db.commit()
+        ids = {"user": users[0].id, "property": properties[5].id}
+    finally:
+        db.close()
+
+    profile_cache.clear()
+    similarity_index.rebuild()
+    return ids
@@ -0,0 +1,23 @@
+"""Recent analyze-property results are reused; image analyses never are"""
+from app.core.database import SessionLocal
+from app.models.ai_analysis import AIAnalysis
+from app.services.analysis_runner import MODEL_VERSION, analysis_runner
+
+def _store(property_id, **fields):
+    with SessionLocal() as db:
+        analysis = AIAnalysis(
+            property_id=property_id, analysis_type="style", model_version=MODEL_VERSION,
+            detected_styles=[{"style": "modern", "confidence": 0.9}], style_confidence=0.9, **fields,
+        )
+        db.add(analysis)
+        db.commit()
+        return analysis.id
+
+def test_recent_property_analysis_is_reused(client, catalog):
+    analysis_id = _store(catalog["property"])
+    assert analysis_runner._fresh_analysis(catalog["property"], "style").id == analysis_id
+
+def test_image_analysis_is_not_reused(client, catalog):
+    _store(catalog["property"])
+    _store(catalog["property"], image_analysis={"brightness": 0.5}, quality_score=0.7)
+    assert analysis_runner._fresh_analysis(catalog["property"], "style") is None
@@ -0,0 +1,37 @@
+"""The item similarity index stays bounded and keeps up with favorites"""
+from app.core.database import SessionLocal
+from app.models.property import UserFavorite
+from app.services import collaborative_filtering
+from app.services.collaborative_filtering import similarity_index
+
+def test_neighbour_lists_are_bounded(catalog, monkeypatch):
+    monkeypatch.setattr(similarity_index, "neighbors", 1)
+    similarity_index.rebuild()
+    # Three items favorited together would otherwise have two neighbours each
+    assert similarity_index.stats()["neighbors"] == 3
+
+def test_favorite_committed_during_rebuild_is_kept(catalog, monkeypatch):
+    user_id, property_id = catalog["user"], catalog["property"]
+    favorites = similarity_index.user_items(user_id)
+    snapshot_session = collaborative_filtering.ReadSessionLocal
+
+    class CommitAfterSnapshot:
+        """A read session that sees the table before a concurrent favorite is committed"""
+
+        def __init__(self):
+            self.session = snapshot_session()
+
+        def query(self, *entities):
+            return self.session.query(*entities)
+
+        def close(self):
+            self.session.close()
+            with SessionLocal() as db:
+                db.add(UserFavorite(user_id=user_id, property_id=property_id))
+                db.commit()
+
+    monkeypatch.setattr(collaborative_filtering, "ReadSessionLocal", CommitAfterSnapshot)
+    similarity_index.rebuild()
+
+    assert similarity_index.user_items(user_id) == favorites | {property_id}
+    assert property_id in dict(similarity_index.recommend(favorites, limit=10))
@@ -0,0 +1,17 @@
+"""Conditional GETs of a listing see every update, however close together"""
+
+def test_property_etag_changes_on_each_update(client, catalog):
+    path = f"/api/properties/{catalog['property']}"
+    etags = [client.get(path).headers["etag"]]
+    for price in (2000000, 2100000):
+        assert client.put(path, json={"price": price}).status_code == 200
+        response = client.get(path, headers={"If-None-Match": etags[-1]})
+        assert response.status_code == 200
+        assert response.json()["price"] == price
+        etags.append(response.headers["etag"])
+    assert len(set(etags)) == 3
+
+def test_unchanged_property_is_not_modified(client, catalog):
+    path = f"/api/properties/{catalog['property']}"
+    etag = client.get(path).headers["etag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
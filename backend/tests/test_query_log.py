@@ -0,0 +1,21 @@
+"""N+1 statement patterns fail the test suite"""
+import pytest
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.query_log import NPlusOneError, track_queries
+from app.models.property import Property
+
+def test_lazy_loads_per_row_raise(catalog):
+    assert settings.QUERY_LOG_RAISE_ON_N_PLUS_ONE
+    with SessionLocal() as db:
+        properties = db.query(Property).limit(settings.N_PLUS_ONE_THRESHOLD).all()
+        with pytest.raises(NPlusOneError), track_queries("test"):
+            for property in properties:
+                property.ai_analyses
+
+def test_eager_loading_does_not_raise(catalog):
+    with SessionLocal() as db, track_queries("test") as queries:
+        for property in db.query(Property).options(selectinload(Property.ai_analyses)).all():
+            property.ai_analyses
+    assert queries.count == 2
@@ -0,0 +1,36 @@
+"""Recommendation endpoints load their listings in a fixed number of queries"""
+import pytest
+
+from app.core.query_log import track_queries
+from app.services.user_profile import profile_cache
+
+def _count_queries(client, path, **params):
+    with track_queries("test") as queries:
+        response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    assert response.json()
+    return queries.count
+
+def test_user_recommendations(client, catalog):
+    # User and search history (compiling the profile), favorites, candidates
+    assert _count_queries(client, f"/api/recommendations/user/{catalog['user']}/properties") == 4
+
+def test_user_recommendations_with_cached_profile(client, catalog):
+    _count_queries(client, f"/api/recommendations/user/{catalog['user']}/properties")
+    assert profile_cache.get(catalog["user"]) is not None
+    # Favorites and candidates only
+    assert _count_queries(client, f"/api/recommendations/user/{catalog['user']}/properties") == 2
+
+def test_similar_properties(client, catalog):
+    # Target listing, then candidates in its price band
+    assert _count_queries(client, f"/api/recommendations/similar/{catalog['property']}") == 2
+
+def test_style_based_recommendations(client, catalog):
+    assert _count_queries(client, "/api/recommendations/style-based", style_keywords="modern") == 1
+
+def test_trending_properties(client, catalog):
+    assert _count_queries(client, "/api/recommendations/trending") == 1
+
+@pytest.mark.parametrize("limit", [5, 20])
+def test_query_count_does_not_grow_with_results(client, catalog, limit):
+    assert _count_queries(client, "/api/recommendations/trending", limit=limit) == 1
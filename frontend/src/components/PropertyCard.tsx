@@ -1,12 +1,12 @@
 import React from 'react';
 import { Link } from 'react-router-dom';
-import { Property } from '../types/index';
+import { PropertySummary } from '../types/index';
 import { MapPin, Bed, Bath, Square, Star } from 'lucide-react';
 import { useLocale } from '../contexts/LocaleContext';
 import { formatPrice, formatArea, getLocalizedText } from '../utils/localization';
 
 interface PropertyCardProps {
-  property: Property;
+  property: PropertySummary;
   showAI?: boolean;
   aiAnalysis?: any;
 }
@@ -18,9 +18,9 @@ const PropertyCard: React.FC<PropertyCardProps> = ({ property, showAI = false, a
     <div className="bg-white dark:bg-gray-800 rounded-2xl shadow-lg overflow-hidden hover:shadow-2xl transition-all duration-300 transform hover:-translate-y-1 group">
       {/* Property Image */}
       <div className="relative h-56 bg-gray-200 dark:bg-gray-700 overflow-hidden">
-        {property.images && property.images.length > 0 ? (
+        {property.thumbnail ? (
           <img
-            src={property.images[0]}
+            src={property.thumbnail}
             alt={property.title}
             className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
           />
@@ -1,10 +1,10 @@
 import React, { createContext, useContext, useState, ReactNode } from 'react';
-import { Property, PropertySearchParams, PropertyResponse } from '../types/index';
+import { Property, PropertySummary, PropertySearchParams, PropertyResponse } from '../types/index';
 import { propertyApi } from '../services/api';
 
 interface PropertyContextType {
-  properties: Property[];
-  featuredProperties: Property[];
+  properties: PropertySummary[];
+  featuredProperties: PropertySummary[];
   searchResults: PropertyResponse | null;
   loading: boolean;
   searchProperties: (params: PropertySearchParams) => Promise<void>;
@@ -28,8 +28,8 @@ interface PropertyProviderProps {
 }
 
 export const PropertyProvider: React.FC<PropertyProviderProps> = ({ children }) => {
-  const [properties, setProperties] = useState<Property[]>([]);
-  const [featuredProperties, setFeaturedProperties] = useState<Property[]>([]);
+  const [properties, setProperties] = useState<PropertySummary[]>([]);
+  const [featuredProperties, setFeaturedProperties] = useState<PropertySummary[]>([]);
   const [searchResults, setSearchResults] = useState<PropertyResponse | null>(null);
   const [loading, setLoading] = useState(false);
 
@@ -1,9 +1,11 @@
 import axios from 'axios';
 import { 
   Property, 
+  PropertySummary,
   PropertySearchParams, 
   PropertyResponse, 
   AIAnalysis, 
+  AIAnalysisHistory,
   User, 
   LoginCredentials, 
   RegisterData, 
@@ -16,6 +18,8 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Sends the read-your-writes cookie, so reads right after a write see it
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -54,12 +58,12 @@ export const propertyApi = {
     return response.data;
   },
 
-  getFeatured: async (limit: number = 10): Promise<Property[]> => {
+  getFeatured: async (limit: number = 10): Promise<PropertySummary[]> => {
     const response = await api.get('/api/properties/featured/', { params: { limit } });
     return response.data;
   },
 
-  create: async (property: Omit<Property, 'id' | 'created_at' | 'updated_at' | 'is_active'>): Promise<Property> => {
+  create: async (property: Omit<Property, 'id' | 'created_at' | 'updated_at' | 'is_active' | 'market' | 'currency' | 'price_normalized'> & { market?: string; currency?: string }): Promise<Property> => {
     const response = await api.post('/api/properties/', property);
     return response.data;
   },
@@ -98,12 +102,24 @@ export const aiApi = {
     return response.data;
   },
 
-  getPropertyAnalysis: async (propertyId: number, analysisType?: string): Promise<AIAnalysis[]> => {
-    const params = analysisType ? { analysis_type: analysisType } : {};
+  getPropertyAnalysis: async (
+    propertyId: number,
+    analysisType?: string,
+    cursor?: number,
+    limit: number = 20
+  ): Promise<AIAnalysisHistory> => {
+    const params: Record<string, string | number> = { limit };
+    if (analysisType) params.analysis_type = analysisType;
+    if (cursor !== undefined) params.cursor = cursor;
     const response = await api.get(`/api/ai/property/${propertyId}/analysis`, { params });
     return response.data;
   },
 
+  getLatestPropertyAnalysis: async (propertyId: number): Promise<AIAnalysis[]> => {
+    const response = await api.get(`/api/ai/property/${propertyId}/analysis/latest`);
+    return response.data;
+  },
+
   getPricePrediction: async (propertyId: number): Promise<any> => {
     const response = await api.get(`/api/ai/price-prediction/${propertyId}`);
     return response.data;
@@ -148,7 +164,7 @@ export const authApi = {
 
 // Recommendations API
 export const recommendationApi = {
-  getUserRecommendations: async (userId: number, limit: number = 10, recommendationType?: string): Promise<Property[]> => {
+  getUserRecommendations: async (userId: number, limit: number = 10, recommendationType?: string): Promise<PropertySummary[]> => {
     const params: any = { limit };
     if (recommendationType) params.recommendation_type = recommendationType;
     
@@ -156,19 +172,19 @@ export const recommendationApi = {
     return response.data;
   },
 
-  getStyleBasedRecommendations: async (styleKeywords: string[], limit: number = 10): Promise<Property[]> => {
+  getStyleBasedRecommendations: async (styleKeywords: string[], limit: number = 10): Promise<PropertySummary[]> => {
     const response = await api.get('/api/recommendations/style-based', {
       params: { style_keywords: styleKeywords, limit },
     });
     return response.data;
   },
 
-  getSimilarProperties: async (propertyId: number, limit: number = 10): Promise<Property[]> => {
+  getSimilarProperties: async (propertyId: number, limit: number = 10): Promise<PropertySummary[]> => {
     const response = await api.get(`/api/recommendations/similar/${propertyId}`, { params: { limit } });
     return response.data;
   },
 
-  getTrendingProperties: async (limit: number = 10): Promise<Property[]> => {
+  getTrendingProperties: async (limit: number = 10): Promise<PropertySummary[]> => {
     const response = await api.get('/api/recommendations/trending', { params: { limit } });
     return response.data;
   },
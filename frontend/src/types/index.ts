@@ -3,6 +3,8 @@ export interface Property {
   title: string;
   description?: string;
   price: number;
+  currency: string;
+  price_normalized?: number;
   area?: number;
   rooms?: number;
   bedrooms?: number;
@@ -10,6 +12,7 @@ export interface Property {
   address?: string;
   city?: string;
   postal_code?: string;
+  market: string;
   latitude?: number;
   longitude?: number;
   property_type?: string;
@@ -24,10 +27,28 @@ export interface Property {
   is_active: boolean;
 }
 
+export interface PropertySummary {
+  id: number;
+  title: string;
+  price: number;
+  currency?: string;
+  area?: number;
+  rooms?: number;
+  bedrooms?: number;
+  bathrooms?: number;
+  address?: string;
+  city?: string;
+  market?: string;
+  property_type?: string;
+  condition?: string;
+  thumbnail?: string;
+}
+
 export interface PropertySearchParams {
   query?: string;
   min_price?: number;
   max_price?: number;
+  currency?: string;
   min_area?: number;
   max_area?: number;
   rooms?: number;
@@ -36,16 +57,26 @@ export interface PropertySearchParams {
   property_type?: string;
   city?: string;
   postal_code?: string;
+  market?: string;
   page?: number;
   limit?: number;
+  facets?: boolean;
+}
+
+export interface FacetCount {
+  value?: string | number;
+  min?: number;
+  max?: number;
+  count: number;
 }
 
 export interface PropertyResponse {
-  properties: Property[];
+  properties: PropertySummary[];
   total: number;
   page: number;
   limit: number;
   total_pages: number;
+  facets?: Record<string, FacetCount[]>;
 }
 
 export interface AIAnalysis {
@@ -68,6 +99,12 @@ export interface AIAnalysis {
   created_at: string;
 }
 
+export interface AIAnalysisHistory {
+  analyses: AIAnalysis[];
+  next_cursor?: number | null;
+  limit: number;
+}
+
 export interface User {
   id: number;
   email: string;